@@ -68,6 +68,7 @@ def demo_shared_memory():
         
         print(f"\nOrder Book Data:")
         print(f"  Timestamp: {data['timestamp']}")
+        print(f"  Age: {(time.monotonic_ns() - data['timestamp_ns']) / 1000:.1f} us")
         print(f"  Bids: {data['bids'][:3]}")
         print(f"  Asks: {data['asks'][:3]}")
         
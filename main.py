@@ -3,23 +3,34 @@
 Main orchestrator for the multi-process trading system.
 Launches and manages all processes.
 """
+import os
 import time
 import signal
 import sys
 import logging
-from multiprocessing import Process
+import multiprocessing
+from multiprocessing import Process, shared_memory
 import argparse
 
 from src.processes.gateway import run_gateway
 from src.processes.orderbook import run_orderbook
-from src.processes.strategy import run_strategy
+from src.processes.strategy import run_strategy, run_strategy_with_ordermanager
 from src.processes.ordermanager import run_ordermanager
 from src.utils.config import Config
-from src.utils.shared_memory import OrderBookSharedMemory
+from src.utils.shm_bus import topic_shm_name
+
+
+# Imported once by the forkserver so every child starts with them loaded
+PRELOAD_MODULES = [
+    'src.processes.gateway',
+    'src.processes.orderbook',
+    'src.processes.strategy',
+    'src.processes.ordermanager',
+]
 
 
 logging.basicConfig(
-    level=logging.INFO,
+    level=Config.LOG_LEVEL,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
@@ -36,7 +47,13 @@ class TradingSystem:
         self.logger = logging.getLogger("TradingSystem")
         self.processes = {}
         self.duration = duration
-        self.shutdown_requested = False
+        self.shutdown_requested = 0  # number of the signal that requested shutdown
+        
+        # Start children from a small preloaded server instead of forking this
+        # process or re-importing everything in a fresh interpreter
+        self.mp_context = multiprocessing.get_context(Config.START_METHOD)
+        if Config.START_METHOD == "forkserver":
+            self.mp_context.set_forkserver_preload(PRELOAD_MODULES)
         
         # Register signal handlers
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -49,43 +66,109 @@ class TradingSystem:
             signum: Signal number
             frame: Current stack frame
         """
-        self.logger.info(f"Received signal {signum}, initiating shutdown...")
-        self.shutdown_requested = True
+        # Logging is not safe in a signal handler; monitor_processes logs it
+        self.shutdown_requested = signum
+    
+    def pin_process(self, name: str, process: Process):
+        """Pin a started process to its configured core and scheduling class.
+        
+        Args:
+            name: Process name as used in Config.CPU_PINS
+            process: Started process
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            return
+        
+        core = Config.CPU_PINS.get(name)
+        if core is not None:
+            if core in os.sched_getaffinity(0):
+                os.sched_setaffinity(process.pid, {core})
+                self.logger.info(f"Pinned {name} to CPU {core}")
+            else:
+                self.logger.warning(f"CPU {core} not available, {name} left unpinned")
+        
+        if name in Config.REALTIME_PROCESSES:
+            try:
+                os.sched_setscheduler(
+                    process.pid, os.SCHED_FIFO, os.sched_param(Config.REALTIME_PRIORITY)
+                )
+                self.logger.info(f"Set {name} to SCHED_FIFO priority {Config.REALTIME_PRIORITY}")
+            except PermissionError:
+                self.logger.debug(f"No CAP_SYS_NICE, {name} keeps the default scheduler")
+    
+    def start_process(self, key: str, name: str, target):
+        """Start a process without waiting for it.
+        
+        Args:
+            key: Process key as used in Config.CPU_PINS
+            name: Process name for logging
+            target: Process entry point accepting a ready_event keyword
+            
+        Returns:
+            Event the process sets once it is ready
+        """
+        self.logger.info(f"Starting {name} process...")
+        ready_event = self.mp_context.Event()
+        process = self.mp_context.Process(target=target, kwargs={'ready_event': ready_event}, name=name)
+        process.start()
+        self.pin_process(key, process)
+        self.processes[key] = process
+        return ready_event
     
     def start_processes(self):
         """Start all trading system processes."""
         self.logger.info("Starting trading system processes...")
         
-        # Start Gateway
-        self.logger.info("Starting Gateway process...")
-        gateway_process = Process(target=run_gateway, name="Gateway")
-        gateway_process.start()
-        self.processes['gateway'] = gateway_process
-        time.sleep(1)  # Give Gateway time to start
-        
-        # Start OrderManager
-        self.logger.info("Starting OrderManager process...")
-        om_process = Process(target=run_ordermanager, name="OrderManager")
-        om_process.start()
-        self.processes['ordermanager'] = om_process
-        time.sleep(1)  # Give OrderManager time to start
-        
-        # Start OrderBook
-        self.logger.info("Starting OrderBook process...")
-        ob_process = Process(target=run_orderbook, name="OrderBook")
-        ob_process.start()
-        self.processes['orderbook'] = ob_process
-        time.sleep(1)  # Give OrderBook time to connect
-        
-        # Start Strategy
-        self.logger.info("Starting Strategy process...")
-        strategy_process = Process(target=run_strategy, name="Strategy")
-        strategy_process.start()
-        self.processes['strategy'] = strategy_process
-        time.sleep(1)  # Give Strategy time to connect
+        # Segments a crashed run never unlinked
+        self.unlink_shared_memory()
+        
+        # Start everything at once; clients retry with backoff until the
+        # process they connect to is up
+        ready_events = {
+            'Gateway': self.start_process('gateway', "Gateway", run_gateway),
+            'OrderBook': self.start_process('orderbook', "OrderBook", run_orderbook),
+        }
+        if Config.SINGLE_PROCESS:
+            ready_events['Strategy'] = self.start_process(
+                'strategy', "Strategy+OrderManager", run_strategy_with_ordermanager
+            )
+        else:
+            ready_events['OrderManager'] = self.start_process('ordermanager', "OrderManager", run_ordermanager)
+            ready_events['Strategy'] = self.start_process('strategy', "Strategy", run_strategy)
+        
+        deadline = time.monotonic() + Config.STARTUP_TIMEOUT
+        for name, ready_event in ready_events.items():
+            if not ready_event.wait(timeout=max(deadline - time.monotonic(), 0)):
+                self.logger.warning(f"{name} did not report ready within {Config.STARTUP_TIMEOUT}s")
         
         self.logger.info("All processes started successfully")
     
+    def unlink_shared_memory(self):
+        """Unlink every shared memory segment the processes create.
+        
+        Runs at shutdown, and before startup so a consumer cannot attach to
+        a segment left behind by a run that crashed.
+        """
+        segments = [("shared memory", Config.ORDERBOOK_SHM_NAME)]
+        if Config.TRANSPORT == "shm":
+            segments += [
+                (f"bus topic '{topic}'", topic_shm_name(topic))
+                for topic in (Config.MARKET_DATA_TOPIC, Config.NEWS_TOPIC)
+            ]
+            segments.append(("order ring", Config.ORDER_RING_NAME))
+        
+        for description, name in segments:
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+                shm.close()
+                shm.unlink()
+                self.logger.info(f"Cleaned up {description}")
+            except FileNotFoundError:
+                # Never created, or already unlinked by its owner
+                pass
+            except Exception as e:
+                self.logger.warning(f"Could not clean up {description}: {e}")
+    
     def monitor_processes(self):
         """Monitor running processes."""
         start_time = time.time()
@@ -109,6 +192,9 @@ class TradingSystem:
             
             # Sleep briefly
             time.sleep(1)
+        
+        if self.shutdown_requested:
+            self.logger.info(f"Received signal {self.shutdown_requested}, initiating shutdown...")
     
     def shutdown_processes(self):
         """Shutdown all processes gracefully."""
@@ -128,14 +214,7 @@ class TradingSystem:
                         process.kill()
                         process.join()
         
-        # Clean up shared memory
-        try:
-            shm = OrderBookSharedMemory(name=Config.ORDERBOOK_SHM_NAME, create=False)
-            shm.close()
-            shm.unlink()
-            self.logger.info("Cleaned up shared memory")
-        except Exception as e:
-            self.logger.warning(f"Could not clean up shared memory: {e}")
+        self.unlink_shared_memory()
         
         self.logger.info("All processes shut down")
     
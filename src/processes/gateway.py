@@ -1,204 +1,404 @@
 """
-Gateway process - Streams market data and news sentiment via TCP.
+Gateway process - Streams market data and news sentiment via TCP and the shared memory bus.
 """
 import socket
 import time
 import random
+import itertools
 from multiprocessing import Process, Event
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import logging
+import selectors
+import signal
 
-from ..utils.protocol import Message, MessageType
+from ..utils.protocol import (
+    Message, MessageType, MARKET_DATA_LEVELS, configure_low_latency, new_market_data_frame, pack_market_data
+)
 from ..utils.config import Config
+from ..utils.shm_bus import Publisher
+from ..utils.shutdown import ShutdownEvent, ignore_interrupts
+from ..utils.async_logging import configure_logging
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+SENTIMENTS = ('positive', 'negative', 'neutral')
+
+# Each symbol/sentiment appears this many times per preshuffled news cycle
+NEWS_CYCLE_REPEATS = 8
+
+# A vanished client surfaces as EPIPE on the send itself, never as SIGPIPE
+SEND_FLAGS = getattr(socket, 'MSG_NOSIGNAL', 0)
 
 
 class Gateway:
     """Gateway process that streams market data and news."""
     
-    def __init__(self, host: str = None, port: int = None):
+    # Waits shorter than this (seconds) sleep instead of waiting on the selector
+    PRECISE_SLEEP_THRESHOLD = 0.001
+    
+    def __init__(self, host: str = None, port: int = None, ready_event: Event = None):
         """Initialize Gateway.
         
         Args:
             host: Host to bind to
             port: Port to bind to
+            ready_event: Event set once the Gateway is accepting connections
         """
         self.host = host or Config.GATEWAY_HOST
         self.port = port or Config.GATEWAY_PORT
         self.logger = logging.getLogger("Gateway")
-        self.shutdown_event = Event()
-        self.clients = []
+        self.shutdown_event = ShutdownEvent()
+        self.ready_event = ready_event
+        self.clients: Dict[socket.socket, bytearray] = {}  # socket -> unsent bytes
+        self.selector = None
+        self.publishers: Dict[str, Publisher] = {}  # topic -> shared memory publisher
+        
+        # Absolute deadlines (time.monotonic_ns()) for the next messages
+        self.next_market_data = 0
+        self.next_news = 0
+        self._market_data_interval_ns = int(Config.MARKET_DATA_INTERVAL * 1e9)
+        self._news_interval_ns = int(Config.NEWS_INTERVAL * 1e9)
+        
+        # Converts monotonic readings to the wall-clock timestamps messages carry,
+        # so each wakeup reads the clock once
+        self._wall_clock_offset_ns = time.time_ns() - time.monotonic_ns()
+        
+        # One preallocated market data frame per symbol, patched in place each tick
+        self._market_data_frames = {symbol: new_market_data_frame() for symbol in Config.SYMBOLS}
+        self._market_data_iovecs = {
+            symbol: (memoryview(frame)[:4], memoryview(frame)[4:])
+            for symbol, frame in self._market_data_frames.items()
+        }
+        self._symbol_bytes = {symbol: symbol.encode('ascii') for symbol in Config.SYMBOLS}
+        self._level_offsets = tuple(i * 0.1 for i in range(MARKET_DATA_LEVELS))
+        self._rng = random.Random()
         
-    def generate_market_data(self, symbol: str) -> dict:
+        # Preshuffled cycles for news generation
+        news_symbols = list(Config.SYMBOLS) * NEWS_CYCLE_REPEATS
+        news_sentiments = list(SENTIMENTS) * NEWS_CYCLE_REPEATS
+        self._news_symbols = itertools.cycle(self._rng.sample(news_symbols, len(news_symbols)))
+        self._news_sentiments = itertools.cycle(self._rng.sample(news_sentiments, len(news_sentiments)))
+        
+    def generate_market_data(self, symbol: str, now_ns: int) -> bytearray:
         """Generate synthetic market data.
         
         Args:
             symbol: Trading symbol
+            now_ns: Current time.monotonic_ns() value
             
         Returns:
-            Market data dictionary
+            Serialized MARKET_DATA frame. The buffer is reused, so it is only
+            valid until the next call for the same symbol.
         """
-        base_price = random.uniform(100, 500)
+        uniform = self._rng.uniform
+        base_price = uniform(100, 500)
         spread = base_price * 0.001  # 0.1% spread
         
         # Generate order book levels
-        bids = []
-        asks = []
-        
-        for i in range(5):
-            bid_price = base_price - spread - i * 0.1
-            ask_price = base_price + spread + i * 0.1
-            size = random.uniform(100, 1000)
-            
-            bids.append([round(bid_price, 2), round(size, 2)])
-            asks.append([round(ask_price, 2), round(size, 2)])
+        best_bid = base_price - spread
+        best_ask = base_price + spread
+        offsets = self._level_offsets
+        bid_prices = [round(best_bid - offset, 2) for offset in offsets]
+        ask_prices = [round(best_ask + offset, 2) for offset in offsets]
+        sizes = [round(uniform(100, 1000), 2) for _ in offsets]
         
-        return {
-            'symbol': symbol,
-            'timestamp': time.time(),
-            'bids': bids,
-            'asks': asks,
-            'last_price': round(base_price, 2),
-            'volume': random.randint(1000, 100000)
-        }
+        frame = self._market_data_frames[symbol]
+        pack_market_data(
+            frame, self._symbol_bytes[symbol], (now_ns + self._wall_clock_offset_ns) / 1e9,
+            bid_prices, sizes, ask_prices, sizes,
+            round(base_price, 2), self._rng.randint(1000, 100000)
+        )
+        return frame
     
-    def generate_news_sentiment(self, symbol: str) -> dict:
+    def generate_news_sentiment(self, symbol: str, now_ns: int) -> dict:
         """Generate synthetic news sentiment.
         
         Args:
             symbol: Trading symbol
+            now_ns: Current time.monotonic_ns() value
             
         Returns:
             News sentiment dictionary
         """
-        sentiments = ['positive', 'negative', 'neutral']
-        sentiment = random.choice(sentiments)
+        sentiment = next(self._news_sentiments)
         
         # Score: -1 to 1
         if sentiment == 'positive':
-            score = random.uniform(0.3, 1.0)
+            score = self._rng.uniform(0.3, 1.0)
         elif sentiment == 'negative':
-            score = random.uniform(-1.0, -0.3)
+            score = self._rng.uniform(-1.0, -0.3)
         else:
-            score = random.uniform(-0.2, 0.2)
+            score = self._rng.uniform(-0.2, 0.2)
         
         return {
             'symbol': symbol,
-            'timestamp': time.time(),
+            'timestamp': (now_ns + self._wall_clock_offset_ns) / 1e9,
             'sentiment': sentiment,
             'score': round(score, 3),
             'headline': f"{sentiment.title()} news for {symbol}"
         }
     
-    def handle_client(self, client_socket, address):
-        """Handle client connection.
+    def produce(self, now_ns: int) -> List[Tuple[str, Tuple[bytes, bytes]]]:
+        """Generate every message due at the given time.
+        
+        Deadlines are absolute on the monotonic clock, so dispatch neither
+        drifts nor gets rounded up to a polling period.
+        
+        Args:
+            now_ns: Current time.monotonic_ns() value
+            
+        Returns:
+            (topic, (length prefix, body)) pairs to broadcast, possibly empty
+        """
+        messages = []
+        
+        # Market data
+        if now_ns >= self.next_market_data:
+            for symbol in Config.SYMBOLS:
+                self.generate_market_data(symbol, now_ns)
+                messages.append((Config.MARKET_DATA_TOPIC, self._market_data_iovecs[symbol]))
+            
+            self.next_market_data += self._market_data_interval_ns
+            if self.next_market_data <= now_ns:
+                # Fell a whole interval behind, skip ahead instead of bursting
+                self.next_market_data = now_ns + self._market_data_interval_ns
+        
+        # News sentiment
+        if now_ns >= self.next_news:
+            symbol = next(self._news_symbols)
+            news = self.generate_news_sentiment(symbol, now_ns)
+            msg = Message(MessageType.NEWS_SENTIMENT, news)
+            messages.append((Config.NEWS_TOPIC, msg.frame()))
+            
+            self.next_news += self._news_interval_ns
+            if self.next_news <= now_ns:
+                self.next_news = now_ns + self._news_interval_ns
+        
+        return messages
+    
+    def broadcast(self, messages: List[Tuple[str, Tuple[bytes, bytes]]]):
+        """Deliver one tick's messages to the bus and every client.
+        
+        Args:
+            messages: (topic, (length prefix, body)) pairs
+        """
+        if self.publishers:
+            for topic, (_, body) in messages:
+                # Written once however many subscribers there are; slots carry
+                # their own length, so only the body is published
+                self.publishers[topic].send(body)
+        
+        # Every prefix and body goes out as its own iovec
+        frames = [buf for _, message in messages for buf in message]
+        for client_socket in list(self.clients):
+            self.send_to_client(client_socket, frames)
+    
+    def send_to_client(self, client_socket, frames: List[bytes]):
+        """Send buffers to a client without blocking.
+        
+        Whatever the kernel does not accept is queued and flushed when the
+        socket becomes writable.
         
         Args:
             client_socket: Client socket
-            address: Client address
+            frames: Buffers in wire order
         """
-        self.logger.info(f"Client connected from {address}")
+        pending = self.clients[client_socket]
+        if pending:
+            # Already backlogged, queue behind earlier data to keep ordering
+            for frame in frames:
+                pending += frame
+        else:
+            try:
+                sent = client_socket.sendmsg(frames, (), SEND_FLAGS)
+            except BlockingIOError:
+                sent = 0
+            except OSError as e:
+                # Only this client is lost, the others keep streaming
+                self.drop_client(client_socket, e)
+                return
+            
+            if sent < sum(len(frame) for frame in frames):
+                pending += b''.join(frames)[sent:]
+                self.selector.modify(
+                    client_socket, selectors.EVENT_READ | selectors.EVENT_WRITE,
+                    self.selector.get_key(client_socket).data
+                )
         
+        if len(pending) > Config.GATEWAY_MAX_CLIENT_BACKLOG:
+            address = self.selector.get_key(client_socket).data
+            self.logger.warning(f"Client {address} too slow, disconnecting")
+            self.drop_client(client_socket)
+    
+    def accept_client(self, server_socket):
+        """Accept a pending connection and register it with the selector.
+        
+        Args:
+            server_socket: Listening socket
+        """
         try:
-            last_market_data_time = 0
-            last_news_time = 0
+            client_socket, address = server_socket.accept()
+        except BlockingIOError:
+            return
+        
+        client_socket.setblocking(False)
+        # Batching is done by the Gateway, so disable Nagle and delayed ACKs
+        configure_low_latency(client_socket)
+        
+        self.clients[client_socket] = bytearray()
+        self.selector.register(client_socket, selectors.EVENT_READ, address)
+        self.logger.info(f"Client connected from {address}")
+    
+    def service_client(self, client_socket, mask: int):
+        """Handle selector readiness on a client socket.
+        
+        Args:
+            client_socket: Client socket
+            mask: Ready events
+        """
+        if mask & selectors.EVENT_READ:
+            # Clients never send anything meaningful; EOF means disconnect
+            try:
+                data = client_socket.recv(Config.SOCKET_BUFFER_SIZE)
+            except BlockingIOError:
+                data = None
+            except OSError as e:
+                self.drop_client(client_socket, e)
+                return
+            if data == b'':
+                self.drop_client(client_socket)
+                return
+        
+        if mask & selectors.EVENT_WRITE:
+            pending = self.clients[client_socket]
+            try:
+                sent = client_socket.send(pending, SEND_FLAGS)
+            except BlockingIOError:
+                sent = 0
+            except OSError as e:
+                self.drop_client(client_socket, e)
+                return
             
-            while not self.shutdown_event.is_set():
-                current_time = time.time()
-                
-                # Send market data
-                if current_time - last_market_data_time >= Config.MARKET_DATA_INTERVAL:
-                    for symbol in Config.SYMBOLS:
-                        market_data = self.generate_market_data(symbol)
-                        msg = Message(MessageType.MARKET_DATA, market_data)
-                        
-                        try:
-                            client_socket.sendall(msg.serialize())
-                        except (BrokenPipeError, ConnectionResetError):
-                            self.logger.warning(f"Client {address} disconnected")
-                            return
-                    
-                    last_market_data_time = current_time
-                
-                # Send news sentiment
-                if current_time - last_news_time >= Config.NEWS_INTERVAL:
-                    symbol = random.choice(Config.SYMBOLS)
-                    news = self.generate_news_sentiment(symbol)
-                    msg = Message(MessageType.NEWS_SENTIMENT, news)
-                    
-                    try:
-                        client_socket.sendall(msg.serialize())
-                    except (BrokenPipeError, ConnectionResetError):
-                        self.logger.warning(f"Client {address} disconnected")
-                        return
-                    
-                    last_news_time = current_time
-                
-                # Small sleep to prevent busy waiting
-                time.sleep(0.01)
+            del pending[:sent]
+            if not pending:
+                self.selector.modify(
+                    client_socket, selectors.EVENT_READ,
+                    self.selector.get_key(client_socket).data
+                )
+    
+    def drop_client(self, client_socket, error: Optional[OSError] = None):
+        """Unregister and close a client socket.
         
-        except Exception as e:
-            self.logger.error(f"Error handling client {address}: {e}")
-        finally:
-            client_socket.close()
+        Args:
+            client_socket: Client socket
+            error: Socket error that ended the connection, if any
+        """
+        address = self.selector.unregister(client_socket).data
+        del self.clients[client_socket]
+        client_socket.close()
+        if error is None:
             self.logger.info(f"Client {address} disconnected")
+        else:
+            self.logger.warning(f"Client {address} dropped: {error}")
     
     def run(self):
-        """Run the Gateway server."""
+        """Run the Gateway server.
+        
+        A single thread owns a selector over the listening socket and all
+        clients; each tick is generated once and sent to every client.
+        """
         self.logger.info(f"Starting Gateway on {self.host}:{self.port}")
         
         # Create server socket
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Inherited by accepted sockets
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, Config.SOCKET_KERNEL_BUFFER_SIZE)
         server_socket.bind((self.host, self.port))
         server_socket.listen(5)
-        server_socket.settimeout(1.0)  # Allow periodic checking of shutdown event
+        server_socket.setblocking(False)
+        
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(server_socket, selectors.EVENT_READ)
+        # Shutdown wakes the same select() call as socket I/O
+        self.selector.register(self.shutdown_event, selectors.EVENT_READ)
+        
+        if Config.TRANSPORT == "shm":
+            for topic in (Config.MARKET_DATA_TOPIC, Config.NEWS_TOPIC):
+                self.publishers[topic] = Publisher(topic)
+            self.logger.info(f"Publishing topics {list(self.publishers)} on the shared memory bus")
         
         self.logger.info("Gateway ready to accept connections")
+        if self.ready_event is not None:
+            self.ready_event.set()
+        
+        self.next_market_data = time.monotonic_ns()
+        self.next_news = self.next_market_data
         
         try:
             while not self.shutdown_event.is_set():
-                try:
-                    client_socket, address = server_socket.accept()
-                    
-                    # Handle client in a separate thread/process
-                    # For simplicity, we'll handle in the same process
-                    # In production, use threading or separate process
-                    import threading
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, address),
-                        daemon=True
-                    )
-                    client_thread.start()
-                    
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    if not self.shutdown_event.is_set():
-                        self.logger.error(f"Error accepting connection: {e}")
+                # One clock read per wakeup serves the deadlines and the
+                # message timestamps
+                now_ns = time.monotonic_ns()
+                messages = self.produce(now_ns)
+                if messages:
+                    self.broadcast(messages)
+                
+                # Wait for socket events until the next message is due
+                delay = (min(self.next_market_data, self.next_news) - now_ns) / 1e9
+                if 0 < delay < self.PRECISE_SLEEP_THRESHOLD:
+                    # The selector timeout has millisecond resolution; time.sleep
+                    # uses an absolute-deadline clock_nanosleep on Linux
+                    time.sleep(delay)
+                    delay = 0
+                
+                for key, mask in self.selector.select(min(max(delay, 0), 1.0)):
+                    if key.fileobj is server_socket:
+                        self.accept_client(server_socket)
+                    elif key.fileobj is self.shutdown_event:
+                        break
+                    else:
+                        self.service_client(key.fileobj, mask)
+        
+        except Exception as e:
+            self.logger.error(f"Error in Gateway loop: {e}")
         
         finally:
+            if self.shutdown_event.is_set():
+                self.logger.info("Shutting down Gateway")
+            for client_socket in list(self.clients):
+                self.drop_client(client_socket)
+            self.selector.close()
             server_socket.close()
+            self.shutdown_event.close()
+            for publisher in self.publishers.values():
+                publisher.close()
+                publisher.unlink()
             self.logger.info("Gateway shut down")
     
     def shutdown(self):
-        """Shutdown the Gateway."""
-        self.logger.info("Shutting down Gateway")
+        """Shutdown the Gateway.
+        
+        Only sets the shutdown event, so it is safe to call from a signal
+        handler; the run loop logs the shutdown on its way out.
+        """
         self.shutdown_event.set()
 
 
-def run_gateway(host: str = None, port: int = None):
+def run_gateway(host: str = None, port: int = None, ready_event: Event = None):
     """Run Gateway as a separate process.
     
     Args:
         host: Host to bind to
         port: Port to bind to
+        ready_event: Event set once the Gateway is accepting connections
     """
-    gateway = Gateway(host, port)
+    configure_logging()
+    ignore_interrupts()
+    
+    # Python already ignores SIGPIPE, but make it explicit for the send path
+    if hasattr(signal, 'SIGPIPE'):
+        signal.signal(signal.SIGPIPE, signal.SIG_IGN)
+    gateway = Gateway(host, port, ready_event)
+    # Shut down cleanly on terminate() so the bus topics are unlinked
+    signal.signal(signal.SIGTERM, lambda signum, frame: gateway.shutdown())
     gateway.run()
@@ -3,36 +3,43 @@ OrderBook process - Maintains order book state in shared memory.
 Receives updates from Gateway and updates shared memory.
 """
 import socket
+import sys
 import time
 import logging
+import selectors
+import signal
 from multiprocessing import Event
 from typing import Dict, List, Tuple
 
-from ..utils.protocol import Message, MessageType
+from ..utils.protocol import Message, MessageType, FramedReader, configure_low_latency
 from ..utils.config import Config
 from ..utils.shared_memory import OrderBookSharedMemory
+from ..utils.shm_bus import Subscriber
+from ..utils.shutdown import ShutdownEvent, ignore_interrupts
+from ..utils.async_logging import configure_logging, install_async_logging
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Not exported by the socket module; value from <asm-generic/socket.h>
+SO_BUSY_POLL = getattr(socket, 'SO_BUSY_POLL', 46)
 
 
 class OrderBook:
     """OrderBook process that maintains order book state."""
     
-    def __init__(self, gateway_host: str = None, gateway_port: int = None):
+    def __init__(self, gateway_host: str = None, gateway_port: int = None,
+                 ready_event: Event = None):
         """Initialize OrderBook.
         
         Args:
             gateway_host: Gateway host to connect to
             gateway_port: Gateway port to connect to
+            ready_event: Event set once the OrderBook is receiving market data
         """
         self.gateway_host = gateway_host or Config.GATEWAY_HOST
         self.gateway_port = gateway_port or Config.GATEWAY_PORT
         self.logger = logging.getLogger("OrderBook")
-        self.shutdown_event = Event()
+        self.shutdown_event = ShutdownEvent()
+        self.ready_event = ready_event
         
         # Shared memory for order book
         self.shm = OrderBookSharedMemory(
@@ -46,6 +53,11 @@ class OrderBook:
         # Statistics
         self.update_count = 0
         self.last_update_time = time.time()
+        
+        # Per-message constants, snapshotted to skip Config lookups. Decoded
+        # symbols are interned, so comparing with _primary is an identity check.
+        self._primary = Config.SYMBOLS[0]
+        self._log_interval = Config.BENCHMARK_LOG_INTERVAL
     
     def process_market_data(self, data: dict):
         """Process market data message and update order book.
@@ -54,8 +66,10 @@ class OrderBook:
             data: Market data dictionary
         """
         symbol = data['symbol']
-        bids = [(float(price), float(size)) for price, size in data['bids']]
-        asks = [(float(price), float(size)) for price, size in data['asks']]
+        # Levels arrive as (price, size) float pairs from the binary market data
+        # layout, so they are used as-is rather than re-parsed
+        bids = data['bids']
+        asks = data['asks']
         
         # Update in-memory state
         self.order_books[symbol] = {
@@ -69,7 +83,7 @@ class OrderBook:
         # Update shared memory with aggregated order book
         # For simplicity, we'll write the first symbol's data
         # In production, you might aggregate all symbols or use separate SHM blocks
-        if symbol == Config.SYMBOLS[0]:
+        if symbol == self._primary:
             self.shm.write_orderbook(bids, asks)
             self.update_count += 1
     
@@ -79,51 +93,138 @@ class OrderBook:
         Returns:
             Connected socket
         """
-        max_retries = 5
-        retry_delay = 1.0
+        max_retries = Config.CONNECT_MAX_RETRIES
+        retry_delay = Config.CONNECT_RETRY_DELAY
         
         for attempt in range(max_retries):
             try:
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, Config.SOCKET_KERNEL_BUFFER_SIZE)
                 sock.connect((self.gateway_host, self.gateway_port))
+                configure_low_latency(sock)
+                self.tune_receive_path(sock)
                 self.logger.info(f"Connected to Gateway at {self.gateway_host}:{self.gateway_port}")
                 return sock
             except (ConnectionRefusedError, OSError) as e:
                 if attempt < max_retries - 1:
-                    self.logger.warning(f"Connection attempt {attempt + 1} failed, retrying in {retry_delay}s...")
+                    self.logger.warning(f"Connection attempt {attempt + 1} failed, retrying in {retry_delay:.2f}s...")
                     time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, Config.CONNECT_MAX_RETRY_DELAY)
                 else:
                     raise RuntimeError(f"Failed to connect to Gateway after {max_retries} attempts: {e}")
     
+    def tune_receive_path(self, sock: socket.socket):
+        """Busy-poll the receive queue and keep it on the OrderBook's core (Linux only).
+        
+        Args:
+            sock: Connected Gateway socket
+        """
+        if not sys.platform.startswith("linux"):
+            return
+        
+        if Config.SOCKET_BUSY_POLL_US:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, SO_BUSY_POLL, Config.SOCKET_BUSY_POLL_US)
+            except OSError as e:
+                # Raising it above net.core.busy_read needs CAP_NET_ADMIN
+                self.logger.debug(f"SO_BUSY_POLL not set: {e}")
+        
+        core = Config.CPU_PINS.get("orderbook")
+        if core is not None and hasattr(socket, 'SO_INCOMING_CPU'):
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_INCOMING_CPU, core)
+            except OSError as e:
+                self.logger.debug(f"SO_INCOMING_CPU not set: {e}")
+    
+    def subscribe(self, topic: str) -> Subscriber:
+        """Subscribe to a Gateway topic on the shared memory bus.
+        
+        Args:
+            topic: Topic name
+            
+        Returns:
+            Subscriber positioned at the newest message
+        """
+        max_retries = Config.CONNECT_MAX_RETRIES
+        retry_delay = Config.CONNECT_RETRY_DELAY
+        
+        for attempt in range(max_retries):
+            try:
+                subscriber = Subscriber(topic)
+                self.logger.info(f"Subscribed to topic '{topic}'")
+                return subscriber
+            except (RuntimeError, OSError) as e:
+                if attempt < max_retries - 1:
+                    self.logger.warning(f"Subscribe attempt {attempt + 1} failed, retrying in {retry_delay:.2f}s...")
+                    time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, Config.CONNECT_MAX_RETRY_DELAY)
+                else:
+                    raise RuntimeError(f"Failed to subscribe to '{topic}' after {max_retries} attempts: {e}")
+    
+    def handle_message(self, msg: Message) -> bool:
+        """Handle a message from the Gateway.
+        
+        Args:
+            msg: Message received from the Gateway
+            
+        Returns:
+            False if the message asks the OrderBook to stop, True otherwise
+        """
+        # Process market data
+        if msg.msg_type == MessageType.MARKET_DATA:
+            self.process_market_data(msg.data)
+            
+            # Log statistics periodically
+            current_time = time.time()
+            if current_time - self.last_update_time >= self._log_interval:
+                elapsed = current_time - self.last_update_time
+                rate = self.update_count / elapsed
+                self.logger.info(f"Update rate: {rate:.2f} updates/sec, Total updates: {self.update_count}")
+                self.last_update_time = current_time
+                self.update_count = 0
+        
+        elif msg.msg_type == MessageType.SHUTDOWN:
+            self.logger.info("Received shutdown message")
+            return False
+        
+        return True
+    
     def run(self):
         """Run the OrderBook process."""
         self.logger.info("Starting OrderBook process")
         
+        if Config.TRANSPORT == "shm":
+            self.run_bus()
+        else:
+            self.run_tcp()
+    
+    def run_tcp(self):
+        """Consume Gateway messages over TCP."""
         # Connect to Gateway
         gateway_socket = self.connect_to_gateway()
+        reader = FramedReader(gateway_socket)
+        
+        # One select() call wakes for either market data or shutdown
+        selector = selectors.DefaultSelector()
+        selector.register(gateway_socket, selectors.EVENT_READ)
+        selector.register(self.shutdown_event, selectors.EVENT_READ)
+        
+        if self.ready_event is not None:
+            self.ready_event.set()
         
         try:
-            while not self.shutdown_event.is_set():
+            running = True
+            while running and not self.shutdown_event.is_set():
                 try:
-                    # Read message from Gateway
-                    msg, size = Message.read_message(gateway_socket)
-                    
-                    # Process market data
-                    if msg.msg_type == MessageType.MARKET_DATA:
-                        self.process_market_data(msg.data)
-                        
-                        # Log statistics periodically
-                        current_time = time.time()
-                        if current_time - self.last_update_time >= Config.BENCHMARK_LOG_INTERVAL:
-                            elapsed = current_time - self.last_update_time
-                            rate = self.update_count / elapsed
-                            self.logger.info(f"Update rate: {rate:.2f} updates/sec, Total updates: {self.update_count}")
-                            self.last_update_time = current_time
-                            self.update_count = 0
-                    
-                    elif msg.msg_type == MessageType.SHUTDOWN:
-                        self.logger.info("Received shutdown message")
+                    selector.select()
+                    if self.shutdown_event.is_set():
                         break
+                    
+                    # Read every message that has arrived from Gateway
+                    for msg, size in reader.read_messages():
+                        if not self.handle_message(msg):
+                            running = False
+                            break
                 
                 except ConnectionError as e:
                     self.logger.error(f"Connection error: {e}")
@@ -132,25 +233,68 @@ class OrderBook:
                     self.logger.error(f"Error processing message: {e}")
         
         finally:
+            if self.shutdown_event.is_set():
+                self.logger.info("Shutting down OrderBook")
+            selector.close()
             gateway_socket.close()
             self.shm.close()
+            self.shutdown_event.close()
+            self.logger.info("OrderBook process shut down")
+    
+    def run_bus(self):
+        """Consume Gateway market data from the shared memory bus."""
+        subscriber = self.subscribe(Config.MARKET_DATA_TOPIC)
+        if self.ready_event is not None:
+            self.ready_event.set()
+        
+        try:
+            running = True
+            while running and not self.shutdown_event.is_set():
+                payload = subscriber.recv(until=self.shutdown_event)
+                if payload is None:
+                    continue
+                
+                try:
+                    msg = Message.deserialize(payload)
+                    running = self.handle_message(msg)
+                except Exception as e:
+                    self.logger.error(f"Error processing message: {e}")
+        
+        finally:
+            if self.shutdown_event.is_set():
+                self.logger.info("Shutting down OrderBook")
+            if subscriber.dropped:
+                self.logger.warning(f"Fell behind the Gateway and dropped {subscriber.dropped} messages")
+            subscriber.close()
+            self.shm.close()
+            self.shutdown_event.close()
             self.logger.info("OrderBook process shut down")
     
     def shutdown(self):
-        """Shutdown the OrderBook process."""
-        self.logger.info("Shutting down OrderBook")
+        """Shutdown the OrderBook process.
+        
+        Safe to call from a signal handler; the run loop does the logging.
+        """
+        # The run loop closes shared memory on its way out; the main process unlinks it
         self.shutdown_event.set()
-        if hasattr(self, 'shm'):
-            self.shm.close()
-            # Don't unlink here, let the main process do it
 
 
-def run_orderbook(gateway_host: str = None, gateway_port: int = None):
+def run_orderbook(gateway_host: str = None, gateway_port: int = None,
+                  ready_event: Event = None):
     """Run OrderBook as a separate process.
     
     Args:
         gateway_host: Gateway host to connect to
         gateway_port: Gateway port to connect to
+        ready_event: Event set once the OrderBook is receiving market data
     """
-    orderbook = OrderBook(gateway_host, gateway_port)
-    orderbook.run()
+    configure_logging()
+    ignore_interrupts()
+    # Keep log formatting and file writes off the market data thread
+    log_handler = install_async_logging()
+    orderbook = OrderBook(gateway_host, gateway_port, ready_event)
+    signal.signal(signal.SIGTERM, lambda signum, frame: orderbook.shutdown())
+    try:
+        orderbook.run()
+    finally:
+        log_handler.close()
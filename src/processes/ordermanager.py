@@ -1,46 +1,78 @@
 """
 OrderManager process - Manages and logs executed trades.
 """
+import itertools
 import socket
 import time
 import logging
+import queue
+import random
+import selectors
+import signal
+import sys
+import threading
 from multiprocessing import Event
 from typing import List, Dict
-import json
 import os
 
-from ..utils.protocol import Message, MessageType
+from ..utils.protocol import Message, MessageType, FramedReader, configure_low_latency, json_dumps
 from ..utils.config import Config
+from ..utils.async_logging import configure_logging
+from ..utils.shutdown import ShutdownEvent, ignore_interrupts
+from ..utils.shm_ring import ShmRing
+from ..utils.rng import uniform_draws
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Not exported by the socket module; value from <asm-generic/socket.h>
+SO_BUSY_POLL = getattr(socket, 'SO_BUSY_POLL', 46)
 
 
 class OrderManager:
     """OrderManager process that manages and logs trades."""
     
-    def __init__(self, host: str = None, port: int = None, log_file: str = "trades.log"):
+    def __init__(self, host: str = None, port: int = None, log_file: str = "trades.log",
+                 ready_event: Event = None):
         """Initialize OrderManager.
         
         Args:
             host: Host to bind to
             port: Port to bind to
             log_file: File to log trades to
+            ready_event: Event set once the OrderManager is accepting connections
         """
         self.host = host or Config.ORDERMANAGER_HOST
         self.port = port or Config.ORDERMANAGER_PORT
         self.log_file = log_file
         self.logger = logging.getLogger("OrderManager")
-        self.shutdown_event = Event()
+        self.shutdown_event = ShutdownEvent()
+        self.ready_event = ready_event
+        
+        # Trade log lines are queued here and written in batches by a
+        # background thread, so order handling never waits on the file
+        self._log_queue: queue.Queue = queue.Queue()
+        self._log_writer = None
+        self.selector = None
+        self.order_ring = None  # Strategy orders when Config.TRANSPORT is "shm"
+        
+        # Simulated slippage, 0.1% either way. The bound __next__ saves a
+        # global lookup of next() per order.
+        self._next_slippage = uniform_draws(random.Random(), -0.001, 0.001).__next__
+        
+        # Execution IDs: a per-run prefix plus a sequence number, unique even
+        # for several executions within the same microsecond
+        self._execution_prefix = f"EXEC_{int(time.time())}_"
+        self._next_execution_seq = itertools.count(1).__next__
+        
+        # Per-message constants, snapshotted to skip Config lookups
+        self._log_interval = Config.BENCHMARK_LOG_INTERVAL
         
         # Trade tracking
         self.orders: List[Dict] = []
         self.executed_trades: List[Dict] = []
         
-        # Statistics
+        # Statistics. Only one thread reads or writes these (the event loop,
+        # or the Strategy's thread in single-process mode), so plain
+        # attributes need no locking or sharding.
         self.total_orders = 0
         self.total_executed = 0
         self.total_volume = 0.0
@@ -59,17 +91,15 @@ class OrderManager:
         Returns:
             Execution result dictionary
         """
-        import random
-        
         # Simulate order execution
         # In a real system, this would interact with an exchange
         
         # Simulate execution price with slippage
-        slippage = random.uniform(-0.001, 0.001)  # 0.1% slippage
+        slippage = self._next_slippage()
         execution_price = order['price'] * (1 + slippage)
         
         execution = {
-            'execution_id': f"EXEC_{int(time.time() * 1000000)}",
+            'execution_id': self._execution_prefix + str(self._next_execution_seq()),
             'order_id': order['order_id'],
             'symbol': order['symbol'],
             'side': order['side'],
@@ -83,24 +113,79 @@ class OrderManager:
         return execution
     
     def log_trade(self, execution: dict):
-        """Log executed trade to file.
+        """Log an executed trade to the trade log file.
+        
+        The line is queued for the writer thread when one is running (see
+        start_trade_log), and appended to the file directly otherwise.
         
         Args:
             execution: Execution dictionary
         """
+        line = json_dumps(execution) + b'\n'
+        if self._log_writer is not None:
+            self._log_queue.put(line)
+            return
+        
         try:
-            with open(self.log_file, 'a') as f:
-                f.write(json.dumps(execution) + '\n')
+            with open(self.log_file, 'ab') as f:
+                f.write(line)
         except Exception as e:
             self.logger.error(f"Failed to log trade: {e}")
     
+    def write_trade_log(self):
+        """Write queued trades to the log file until a None sentinel arrives.
+        
+        Runs on the trade log thread. Everything queued while the previous
+        batch was being written goes out in one write, and the file is
+        flushed whenever the queue runs dry.
+        """
+        log_queue = self._log_queue
+        running = True
+        
+        try:
+            with open(self.log_file, 'ab', buffering=Config.TRADE_LOG_BUFFER_SIZE) as f:
+                while running:
+                    # Block for the first line, then take whatever else is waiting
+                    lines = [log_queue.get()]
+                    while len(lines) < Config.TRADE_LOG_BATCH_SIZE:
+                        try:
+                            lines.append(log_queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    
+                    if None in lines:
+                        running = False
+                        lines = [line for line in lines if line is not None]
+                    
+                    f.write(b''.join(lines))
+                    if log_queue.empty():
+                        f.flush()
+        except Exception as e:
+            self.logger.error(f"Failed to log trades: {e}")
+    
+    def start_trade_log(self):
+        """Start the trade log writer thread."""
+        self._log_writer = threading.Thread(target=self.write_trade_log, name="TradeLog", daemon=True)
+        self._log_writer.start()
+    
+    def stop_trade_log(self):
+        """Write out every queued trade and stop the writer thread."""
+        if self._log_writer is not None:
+            self._log_queue.put(None)
+            self._log_writer.join()
+            self._log_writer = None
+    
     def process_order(self, order: dict):
         """Process incoming order.
         
         Args:
             order: Order dictionary
         """
-        self.logger.info(f"Received order: {order['order_id']} - {order['side']} {order['quantity']} {order['symbol']} @ {order['price']}")
+        # Lazy %-formatting: nothing is formatted unless INFO is enabled
+        self.logger.info(
+            "Received order: %s - %s %s %s @ %s",
+            order['order_id'], order['side'], order['quantity'], order['symbol'], order['price']
+        )
         
         # Track order
         self.orders.append(order)
@@ -115,85 +200,181 @@ class OrderManager:
         # Log trade
         self.log_trade(execution)
         
-        self.logger.info(f"Order executed: {execution['execution_id']} - {execution['status']}")
+        self.logger.info("Order executed: %s - %s", execution['execution_id'], execution['status'])
+    
+    def accept_clients(self, server_socket):
+        """Accept every pending connection and register it with the selector.
+        
+        Drains the accept queue in one wakeup, so a burst of connects costs
+        a single select() call.
+        
+        Args:
+            server_socket: Listening socket
+        """
+        while True:
+            try:
+                client_socket, address = server_socket.accept()
+            except BlockingIOError:
+                return
+            
+            client_socket.setblocking(False)
+            configure_low_latency(client_socket)
+            self.tune_receive_path(client_socket)
+            self.selector.register(client_socket, selectors.EVENT_READ, (address, FramedReader(client_socket)))
+            self.logger.info(f"Client connected from {address}")
+    
+    def tune_receive_path(self, sock: socket.socket):
+        """Busy-poll a client's receive queue (Linux only).
+        
+        Args:
+            sock: Accepted client socket
+        """
+        if not sys.platform.startswith("linux") or not Config.SOCKET_BUSY_POLL_US:
+            return
+        
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_BUSY_POLL, Config.SOCKET_BUSY_POLL_US)
+        except OSError as e:
+            # Raising it above net.core.busy_read needs CAP_NET_ADMIN
+            self.logger.debug(f"SO_BUSY_POLL not set: {e}")
     
-    def handle_client(self, client_socket, address):
-        """Handle client connection.
+    def handle_client(self, client_socket, address, reader: FramedReader):
+        """Process every message that has arrived on a readable client socket.
         
         Args:
             client_socket: Client socket
             address: Client address
+            reader: Framed reader holding the client's partial input
         """
-        self.logger.info(f"Client connected from {address}")
-        
         try:
-            while not self.shutdown_event.is_set():
-                try:
-                    # Read message
-                    msg, size = Message.read_message(client_socket)
-                    
-                    # Process order
-                    if msg.msg_type == MessageType.ORDER:
-                        self.process_order(msg.data)
-                    
-                    elif msg.msg_type == MessageType.SHUTDOWN:
-                        self.logger.info("Received shutdown message")
-                        break
+            messages = reader.read_messages()
+        except BlockingIOError:
+            return
+        except ConnectionError:
+            self.logger.info(f"Client {address} disconnected")
+            self.drop_client(client_socket)
+            return
+        
+        for msg, size in messages:
+            try:
+                # Process order
+                if msg.msg_type == MessageType.ORDER:
+                    self.process_order(msg.data)
                 
-                except ConnectionError:
-                    self.logger.info(f"Client {address} disconnected")
-                    break
-                except Exception as e:
-                    self.logger.error(f"Error processing message: {e}")
+                elif msg.msg_type == MessageType.SHUTDOWN:
+                    self.logger.info("Received shutdown message")
+                    self.drop_client(client_socket)
+                    return
+            
+            except Exception as e:
+                self.logger.error(f"Error processing message: {e}")
+    
+    def drain_order_ring(self):
+        """Process every order waiting in the shared memory order ring."""
+        ring = self.order_ring
+        # Clear the doorbell first, so an order pushed after the drain wakes
+        # the selector again
+        ring.clear_doorbell()
         
-        finally:
-            client_socket.close()
+        for view in ring.drain():
+            try:
+                msg = Message.deserialize(view)
+                if msg.msg_type == MessageType.ORDER:
+                    self.process_order(msg.data)
+            except Exception as e:
+                self.logger.error(f"Error processing message: {e}")
+    
+    def drop_client(self, client_socket):
+        """Unregister and close a client socket.
+        
+        Args:
+            client_socket: Client socket
+        """
+        self.selector.unregister(client_socket)
+        client_socket.close()
     
     def run(self):
-        """Run the OrderManager server."""
+        """Run the OrderManager server.
+        
+        A single thread owns a selector over the listening socket, all
+        clients and the order ring, and processes orders as they are read.
+        """
         self.logger.info(f"Starting OrderManager on {self.host}:{self.port}")
         
         # Create server socket
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Set before listen() so accepted sockets inherit it and the window
+        # scale is negotiated for the larger buffer
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, Config.SOCKET_KERNEL_BUFFER_SIZE)
         server_socket.bind((self.host, self.port))
         server_socket.listen(5)
-        server_socket.settimeout(1.0)
+        server_socket.setblocking(False)
+        
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(server_socket, selectors.EVENT_READ)
+        self.selector.register(self.shutdown_event, selectors.EVENT_READ)
+        
+        if Config.TRANSPORT == "shm":
+            # Co-located Strategy sends orders through shared memory; the TCP
+            # server stays up for other clients
+            self.order_ring = ShmRing(
+                Config.ORDER_RING_NAME, create=True,
+                slot_size=Config.ORDER_RING_SLOT_SIZE, n_slots=Config.ORDER_RING_SLOTS
+            )
+            self.selector.register(self.order_ring, selectors.EVENT_READ)
+        
+        self.start_trade_log()
         
         self.logger.info("OrderManager ready to accept connections")
+        if self.ready_event is not None:
+            self.ready_event.set()
         
         last_stats_time = time.time()
         
         try:
             while not self.shutdown_event.is_set():
                 try:
-                    client_socket, address = server_socket.accept()
+                    for key, mask in self.selector.select(timeout=1.0):
+                        if key.fileobj is server_socket:
+                            self.accept_clients(server_socket)
+                        elif key.fileobj is self.shutdown_event:
+                            break
+                        elif key.fileobj is self.order_ring:
+                            self.drain_order_ring()
+                        else:
+                            address, reader = key.data
+                            self.handle_client(key.fileobj, address, reader)
                     
-                    # Handle client in a separate thread
-                    import threading
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, address),
-                        daemon=True
-                    )
-                    client_thread.start()
-                
-                except socket.timeout:
                     # Log statistics periodically
                     current_time = time.time()
-                    if current_time - last_stats_time >= Config.BENCHMARK_LOG_INTERVAL:
+                    if current_time - last_stats_time >= self._log_interval:
                         self.logger.info(
                             f"Orders: {self.total_orders}, Executed: {self.total_executed}, "
                             f"Volume: ${self.total_volume:.2f}"
                         )
                         last_stats_time = current_time
-                    continue
+                
                 except Exception as e:
                     if not self.shutdown_event.is_set():
-                        self.logger.error(f"Error accepting connection: {e}")
+                        self.logger.error(f"Error in OrderManager loop: {e}")
         
         finally:
+            if self.shutdown_event.is_set():
+                self.logger.info("Shutting down OrderManager")
+            if self.order_ring is not None:
+                # Orders the Strategy pushed before it stopped
+                self.drain_order_ring()
+            for key in list(self.selector.get_map().values()):
+                if key.fileobj not in (server_socket, self.shutdown_event, self.order_ring):
+                    self.drop_client(key.fileobj)
+            self.selector.close()
             server_socket.close()
+            if self.order_ring is not None:
+                self.order_ring.close()
+                self.order_ring.unlink()
+            self.shutdown_event.close()
+            self.stop_trade_log()
             self.logger.info("OrderManager shut down")
             
             # Print final statistics
@@ -203,18 +384,26 @@ class OrderManager:
             )
     
     def shutdown(self):
-        """Shutdown the OrderManager."""
-        self.logger.info("Shutting down OrderManager")
+        """Shutdown the OrderManager.
+        
+        Called from the SIGTERM handler, so it only sets the event.
+        """
         self.shutdown_event.set()
 
 
-def run_ordermanager(host: str = None, port: int = None, log_file: str = "trades.log"):
+def run_ordermanager(host: str = None, port: int = None, log_file: str = "trades.log",
+                     ready_event: Event = None):
     """Run OrderManager as a separate process.
     
     Args:
         host: Host to bind to
         port: Port to bind to
         log_file: File to log trades to
+        ready_event: Event set once the OrderManager is accepting connections
     """
-    ordermanager = OrderManager(host, port, log_file)
+    configure_logging()
+    ignore_interrupts()
+    ordermanager = OrderManager(host, port, log_file, ready_event)
+    # Shut down cleanly on terminate() so queued trades reach the log file
+    signal.signal(signal.SIGTERM, lambda signum, frame: ordermanager.shutdown())
     ordermanager.run()
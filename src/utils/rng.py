@@ -0,0 +1,51 @@
+"""
+Buffered random draws for per-message hot paths.
+Values are drawn a block at a time and handed out with next(), which costs
+far less per value than calling random.uniform or random.randint.
+"""
+import random
+from typing import Iterator
+
+from .config import Config
+
+
+def uniform_draws(rng: random.Random, low: float, high: float,
+                  block_size: int = None) -> Iterator[float]:
+    """Endless stream of uniform floats, like rng.uniform(low, high).
+
+    Args:
+        rng: Random number generator to draw from
+        low: Lower bound
+        high: Upper bound
+        block_size: Values drawn at a time (default Config.RNG_BLOCK_SIZE)
+
+    Yields:
+        Uniform floats in [low, high]
+    """
+    draw = rng.random
+    span = high - low
+    block = range(block_size or Config.RNG_BLOCK_SIZE)
+
+    while True:
+        yield from [low + span * draw() for _ in block]
+
+
+def randint_draws(rng: random.Random, low: int, high: int,
+                  block_size: int = None) -> Iterator[int]:
+    """Endless stream of integers, like rng.randint(low, high).
+
+    Args:
+        rng: Random number generator to draw from
+        low: Lower bound, inclusive
+        high: Upper bound, inclusive
+        block_size: Values drawn at a time (default Config.RNG_BLOCK_SIZE)
+
+    Yields:
+        Integers in [low, high]
+    """
+    draw = rng.random
+    count = high - low + 1
+    block = range(block_size or Config.RNG_BLOCK_SIZE)
+
+    while True:
+        yield from [low + int(draw() * count) for _ in block]
@@ -2,24 +2,58 @@
 Shared memory manager for order book state.
 Uses multiprocessing shared memory for low-latency data sharing.
 """
+import os
 import time
-from multiprocessing import shared_memory, Lock
+from array import array
+from multiprocessing import shared_memory
 import struct
-import json
 from typing import Dict, List, Optional, Tuple
 
 
+# Yields the CPU to another runnable thread (sched_yield is Unix-only)
+_yield_cpu = getattr(os, 'sched_yield', lambda: time.sleep(0))
+
+
 class OrderBookSharedMemory:
     """Manages order book state in shared memory."""
     
     # Memory layout:
-    # - First 8 bytes: timestamp (double)
-    # - Next 4 bytes: number of bid levels (int)
-    # - Next 4 bytes: number of ask levels (int)
-    # - Remaining: JSON encoded order book data
+    # - First 8 bytes: sequence number (u64), odd while a write is in progress
+    # - Next 8 bytes: write time from time.monotonic_ns() (u64). The
+    #   monotonic clock is system-wide, so readers in other processes can
+    #   subtract it from their own monotonic_ns() to get the update's age.
+    # - Next 4 bytes: number of bid levels (u32)
+    # - Next 4 bytes: number of ask levels (u32)
+    # - Next 16 bytes: top of book as best bid price, best bid size, best ask
+    #   price, best ask size (i32 each, 0 when that side is empty)
+    # - Then four MAX_LEVELS arrays of int32, best level first:
+    #   bid prices, bid sizes, ask prices, ask sizes
+    #
+    # Keeping prices and sizes in separate arrays (struct-of-arrays) lets a
+    # reader that only needs prices touch just the price arrays, and the
+    # top of book is copied into the header so get_best_bid_ask reads a
+    # single cache line. Prices are stored as whole ticks of TICK_SIZE and
+    # sizes as whole lots of LOT_SIZE, half the bytes of a
+    # (price, size) double pair; the float API converts at the boundary.
+    #
+    # The single writer (the OrderBook) brackets every update with two
+    # sequence increments (a seqlock). Readers copy the levels out and retry
+    # if the sequence was odd or changed, so nobody takes a lock: readers
+    # never block and never observe a torn update, and writes cost no futex.
+    # Multiple writers would need to serialize among themselves.
+    
+    HEADER_SIZE = 40  # 8 + 8 + 4 + 4 + 4 * 4
+    MAX_LEVELS = 1024
+    ARRAY_SIZE = MAX_LEVELS * 4  # one int32 per level
+    TICK_SIZE = 0.01  # Gateway prices are rounded to cents
+    LOT_SIZE = 0.01  # and so are sizes
+    MEMORY_SIZE = HEADER_SIZE + 4 * ARRAY_SIZE
     
-    HEADER_SIZE = 16  # 8 + 4 + 4
-    MEMORY_SIZE = 1024 * 64  # 64KB for order book data
+    _SEQ = struct.Struct('<Q')
+    _HEADER = struct.Struct('<QIIiiii')  # everything after the sequence
+    _SEQ_HEADER = struct.Struct('<QQIIiiii')  # sequence followed by _HEADER
+    # Sequence, level counts and both best prices in one read from offset 0
+    _BEST_PRICES = struct.Struct('<Q8xIIi4xi')
     
     def __init__(self, name: str = "orderbook_shm", create: bool = True):
         """Initialize shared memory for order book.
@@ -29,7 +63,6 @@ class OrderBookSharedMemory:
             create: Whether to create new shared memory or attach to existing
         """
         self.name = name
-        self.lock = Lock()
         
         if create:
             try:
@@ -54,100 +87,195 @@ class OrderBookSharedMemory:
                 self.shm = shared_memory.SharedMemory(name=name)
             except FileNotFoundError:
                 raise RuntimeError(f"Shared memory '{name}' not found")
+        
+        # Zero-copy int32 views over each array ('i' is 4 bytes on every
+        # supported platform)
+        self._bid_prices, self._bid_sizes, self._ask_prices, self._ask_sizes = [
+            self.shm.buf[offset:offset + self.ARRAY_SIZE].cast('i')
+            for offset in range(self.HEADER_SIZE, self.MEMORY_SIZE, self.ARRAY_SIZE)
+        ]
+        
+        # Only the writer changes the sequence, so it keeps its own copy
+        # instead of loading it back from shared memory on every write
+        self._seq = self._SEQ.unpack_from(self.shm.buf, 0)[0]
+        
+        # Ticks and lots per unit. Converting back divides by these rather
+        # than multiplying by TICK_SIZE, so 10001 ticks reads as exactly
+        # 100.01 instead of 100.01000000000001.
+        self._ticks_per_unit = round(1 / self.TICK_SIZE)
+        self._lots_per_unit = round(1 / self.LOT_SIZE)
     
     def write_orderbook(self, bids: List[Tuple[float, float]], 
                        asks: List[Tuple[float, float]]) -> None:
         """Write order book data to shared memory.
         
+        Levels are stored as int32 counts of TICK_SIZE (0.01) for prices and
+        LOT_SIZE (0.01) for sizes. Each value is rounded to the nearest tick
+        or lot, so a price of 100.004 reads back as 100.0 and a size of 0.006
+        as 0.01, and must lie within the int32 range of ticks or lots
+        (about +/-21.4 million).
+        
         Args:
             bids: List of (price, size) tuples for bid side
             asks: List of (price, size) tuples for ask side
-        """
-        with self.lock:
-            # Prepare data
-            timestamp = time.time()
-            num_bids = len(bids)
-            num_asks = len(asks)
-            
-            # Create JSON data
-            data = {
-                'bids': [[price, size] for price, size in bids],
-                'asks': [[price, size] for price, size in asks]
-            }
-            json_bytes = json.dumps(data).encode('utf-8')
             
-            # Check if data fits
-            if len(json_bytes) > self.MEMORY_SIZE - self.HEADER_SIZE:
-                raise ValueError("Order book data too large for shared memory")
-            
-            # Write header
-            header = struct.pack('>dII', timestamp, num_bids, num_asks)
+        Raises:
+            ValueError: If there are more than MAX_LEVELS levels on a side,
+                or a price or size does not fit in an int32 of ticks or lots
+        """
+        # Quantize and split levels into arrays before entering the write section
+        ticks = self._ticks_per_unit
+        lots = self._lots_per_unit
+        try:
+            arrays = (
+                array('i', [round(price * ticks) for price, _ in bids]),
+                array('i', [round(size * lots) for _, size in bids]),
+                array('i', [round(price * ticks) for price, _ in asks]),
+                array('i', [round(size * lots) for _, size in asks])
+            )
+        except OverflowError:
+            raise ValueError(
+                f"Order book price or size outside the int32 range of "
+                f"{self.TICK_SIZE} ticks / {self.LOT_SIZE} lots"
+            ) from None
+        self.write_orderbook_raw(*arrays)
+    
+    def write_orderbook_raw(self, bid_prices: array, bid_sizes: array,
+                            ask_prices: array, ask_sizes: array) -> None:
+        """Write order book levels already split into the shared memory arrays.
+        
+        The arrays are copied into shared memory as-is, so callers that keep
+        their book in this form skip all per-level Python object handling.
+        Prices are whole ticks of TICK_SIZE and sizes whole lots of LOT_SIZE;
+        int32 arrays cannot hold anything outside the range shared memory
+        stores.
+        
+        Args:
+            bid_prices: array('i') of bid prices in ticks, best first
+            bid_sizes: array('i') of bid sizes in lots, same length as bid_prices
+            ask_prices: array('i') of ask prices in ticks, best first
+            ask_sizes: array('i') of ask sizes in lots, same length as ask_prices
             
-            # Write to shared memory
-            self.shm.buf[:self.HEADER_SIZE] = header
-            self.shm.buf[self.HEADER_SIZE:self.HEADER_SIZE + len(json_bytes)] = json_bytes
-            # Clear remaining bytes to prevent stale data
-            if len(json_bytes) < self.MEMORY_SIZE - self.HEADER_SIZE:
-                self.shm.buf[self.HEADER_SIZE + len(json_bytes):self.MEMORY_SIZE] = b'\x00' * (self.MEMORY_SIZE - self.HEADER_SIZE - len(json_bytes))
+        Raises:
+            ValueError: If there are more than MAX_LEVELS levels on a side,
+                an argument is not an array('i'), or sizes and prices differ
+                in length
+        """
+        num_bids = len(bid_prices)
+        num_asks = len(ask_prices)
+        
+        # Check if data fits
+        if num_bids > self.MAX_LEVELS or num_asks > self.MAX_LEVELS:
+            raise ValueError("Order book data too large for shared memory")
+        
+        # Checked before the write section, which must not fail half way
+        for levels in (bid_prices, bid_sizes, ask_prices, ask_sizes):
+            if not isinstance(levels, array) or levels.typecode != 'i':
+                raise ValueError("Order book levels must be array('i') of int32 ticks or lots")
+        if len(bid_sizes) != num_bids or len(ask_sizes) != num_asks:
+            raise ValueError("Order book prices and sizes differ in length")
+        
+        buf = self.shm.buf
+        seq = self._seq
+        
+        # Odd sequence marks the update as in progress. It is packed together
+        # with the header in one call; pack_into writes fields in order, so
+        # the sequence still lands first. On x86 stores are not reordered
+        # with other stores, so readers that see the final even value also
+        # see everything written before it.
+        self._SEQ_HEADER.pack_into(
+            buf, 0, seq + 1, time.monotonic_ns(), num_bids, num_asks,
+            bid_prices[0] if num_bids else 0, bid_sizes[0] if num_bids else 0,
+            ask_prices[0] if num_asks else 0, ask_sizes[0] if num_asks else 0
+        )
+        self._bid_prices[:num_bids] = bid_prices
+        self._bid_sizes[:num_bids] = bid_sizes
+        self._ask_prices[:num_asks] = ask_prices
+        self._ask_sizes[:num_asks] = ask_sizes
+        self._SEQ.pack_into(buf, 0, seq + 2)
+        self._seq = seq + 2
     
     def read_orderbook(self) -> Optional[Dict]:
         """Read order book data from shared memory.
         
         Returns:
-            Dictionary with timestamp, bids, and asks, or None if no data
+            Dictionary with timestamp (wall-clock seconds of the write, as
+            from time.time()), timestamp_ns (time.monotonic_ns() at the
+            write), bids, and asks, or None if no data
         """
-        with self.lock:
-            # Read header
-            header_bytes = bytes(self.shm.buf[:self.HEADER_SIZE])
-            timestamp, num_bids, num_asks = struct.unpack('>dII', header_bytes)
+        buf = self.shm.buf
+        
+        while True:
+            seq = self._SEQ.unpack_from(buf, 0)[0]
             
-            # If timestamp is 0, no data written yet
-            if timestamp == 0:
+            # Nothing written yet
+            if seq == 0:
                 return None
             
-            # Read JSON data up to null terminator
-            # We search for null bytes to determine the actual JSON data length
-            max_json_size = self.MEMORY_SIZE - self.HEADER_SIZE
-            json_bytes = bytes(self.shm.buf[self.HEADER_SIZE:self.HEADER_SIZE + max_json_size])
+            # Writer is mid-update; give up the CPU in case it was preempted
+            # there, otherwise this would spin for the rest of the timeslice
+            if seq & 1:
+                _yield_cpu()
+                continue
             
-            # Find the actual end of JSON data (first null byte indicates end)
-            try:
-                null_index = json_bytes.index(b'\x00')
-                json_bytes = json_bytes[:null_index]
-            except ValueError:
-                # No null byte found, use all data
-                pass
-            
-            # Parse JSON
-            try:
-                data = json.loads(json_bytes.decode('utf-8'))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                return None
+            timestamp_ns, num_bids, num_asks = self._HEADER.unpack_from(buf, 8)[:3]
+            if num_bids > self.MAX_LEVELS or num_asks > self.MAX_LEVELS:
+                # Header torn by a concurrent write, retry
+                continue
+            bid_prices = self._bid_prices[:num_bids].tolist()
+            bid_sizes = self._bid_sizes[:num_bids].tolist()
+            ask_prices = self._ask_prices[:num_asks].tolist()
+            ask_sizes = self._ask_sizes[:num_asks].tolist()
             
-            return {
-                'timestamp': timestamp,
-                'bids': [(price, size) for price, size in data['bids']],
-                'asks': [(price, size) for price, size in data['asks']]
-            }
+            # Retry if a write started while we were copying
+            if self._SEQ.unpack_from(buf, 0)[0] == seq:
+                break
+        
+        # The header only holds the monotonic write time; shift it onto the
+        # wall clock by the update's age
+        timestamp = time.time() - (time.monotonic_ns() - timestamp_ns) / 1e9
+        
+        ticks = self._ticks_per_unit
+        lots = self._lots_per_unit
+        return {
+            'timestamp': timestamp,
+            'timestamp_ns': timestamp_ns,
+            'bids': [(price / ticks, size / lots) for price, size in zip(bid_prices, bid_sizes)],
+            'asks': [(price / ticks, size / lots) for price, size in zip(ask_prices, ask_sizes)]
+        }
     
     def get_best_bid_ask(self) -> Optional[Tuple[float, float]]:
         """Get best bid and ask prices.
         
+        Reads only the top of book cached in the header, never the levels.
+        
         Returns:
             Tuple of (best_bid, best_ask) or None if no data
         """
-        orderbook = self.read_orderbook()
-        if not orderbook or not orderbook['bids'] or not orderbook['asks']:
-            return None
+        buf = self.shm.buf
         
-        best_bid = orderbook['bids'][0][0]  # First bid price
-        best_ask = orderbook['asks'][0][0]  # First ask price
+        while True:
+            seq, num_bids, num_asks, best_bid, best_ask = self._BEST_PRICES.unpack_from(buf, 0)
+            if seq == 0:
+                return None
+            if seq & 1:
+                _yield_cpu()
+                continue
+            
+            if self._SEQ.unpack_from(buf, 0)[0] == seq:
+                break
+        
+        if not num_bids or not num_asks:
+            return None
         
-        return best_bid, best_ask
+        return best_bid / self._ticks_per_unit, best_ask / self._ticks_per_unit
     
     def close(self):
         """Close shared memory."""
         if hasattr(self, 'shm'):
+            # Views must be released before the mapping can be closed
+            for view in (self._bid_prices, self._bid_sizes, self._ask_prices, self._ask_sizes):
+                view.release()
             self.shm.close()
     
     def unlink(self):
@@ -0,0 +1,256 @@
+"""
+Shared memory publish/subscribe bus for one-to-many IPC.
+A publisher writes each message once into a per-topic ring in shared memory
+and any number of subscribers read it, so publishing cost does not grow with
+the number of consumers.
+"""
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Sequence
+
+from .config import Config
+from .shm_owner import is_live, mark_live, mark_retired
+
+
+def topic_shm_name(topic: str) -> str:
+    """Name of the shared memory block backing a topic."""
+    return f"{Config.SHM_BUS_PREFIX}{topic}"
+
+
+class _TopicRing:
+    """Broadcast ring of fixed-size slots shared by a publisher and its subscribers."""
+
+    # Memory layout:
+    # - First 8 bytes: tail, number of messages ever published (u64)
+    # - Next 4 bytes: slot size in bytes (u32)
+    # - Next 4 bytes: number of slots (u32)
+    # - Next 8 bytes: owner stamp, magic and publisher pid (see shm_owner)
+    # - Remaining: slots, each a sequence number (u64), payload length (u32),
+    #   padding (u32) and the payload
+    #
+    # Message n lives in slot n % n_slots. Its slot sequence is 2n + 1 while
+    # the publisher writes it and 2n + 2 once complete, so a subscriber can
+    # tell a finished message from one being written or already overwritten.
+
+    HEADER_SIZE = 24  # 8 + 4 + 4 + 8
+    SLOT_HEADER_SIZE = 16  # 8 + 4 + 4
+
+    _INDEX = struct.Struct('<Q')
+    _GEOMETRY = struct.Struct('<II')
+    _SLOT_LEN = struct.Struct('<I')
+
+    TAIL_OFFSET = 0
+    GEOMETRY_OFFSET = 8
+    OWNER_OFFSET = 16
+
+    def __init__(self, topic: str, create: bool, slot_size: int = 0, n_slots: int = 0):
+        self.topic = topic
+        name = topic_shm_name(topic)
+
+        if create:
+            try:
+                old_shm = shared_memory.SharedMemory(name=name)
+                mark_retired(old_shm.buf, self.OWNER_OFFSET)
+                old_shm.close()
+                old_shm.unlink()
+            except FileNotFoundError:
+                pass
+
+            self.shm = shared_memory.SharedMemory(
+                name=name,
+                create=True,
+                size=self.HEADER_SIZE + slot_size * n_slots
+            )
+            self._GEOMETRY.pack_into(self.shm.buf, self.GEOMETRY_OFFSET, slot_size, n_slots)
+            mark_live(self.shm.buf, self.OWNER_OFFSET)
+        else:
+            try:
+                self.shm = shared_memory.SharedMemory(name=name)
+            except FileNotFoundError:
+                raise RuntimeError(f"Topic '{topic}' has no publisher")
+
+            # Left behind by a publisher that died, or not initialized yet
+            if not is_live(self.shm.buf, self.OWNER_OFFSET):
+                self.shm.close()
+                del self.shm
+                raise RuntimeError(f"Topic '{topic}' has no live publisher")
+
+        self.slot_size, self.n_slots = self._GEOMETRY.unpack_from(self.shm.buf, self.GEOMETRY_OFFSET)
+        self.max_payload = self.slot_size - self.SLOT_HEADER_SIZE
+        self._buf = self.shm.buf
+
+    def _load(self, offset: int) -> int:
+        return self._INDEX.unpack_from(self._buf, offset)[0]
+
+    def _store(self, offset: int, value: int) -> None:
+        self._INDEX.pack_into(self._buf, offset, value)
+
+    def _slot_offset(self, index: int) -> int:
+        return self.HEADER_SIZE + (index % self.n_slots) * self.slot_size
+
+    def close(self):
+        """Close the shared memory block."""
+        if hasattr(self, 'shm'):
+            self._buf = None
+            self.shm.close()
+
+
+class Publisher(_TopicRing):
+    """Publishes messages on a topic. There must be one publisher per topic."""
+
+    def __init__(self, topic: str, slot_size: int = None, n_slots: int = None):
+        """Create the topic's shared memory ring.
+
+        Args:
+            topic: Topic name
+            slot_size: Size of each slot in bytes
+            n_slots: Number of slots; subscribers more than this many
+                messages behind lose the oldest ones
+        """
+        super().__init__(
+            topic,
+            create=True,
+            slot_size=slot_size or Config.SHM_BUS_SLOT_SIZE,
+            n_slots=n_slots or Config.SHM_BUS_SLOTS
+        )
+        self._tail = 0
+
+    def send(self, data) -> None:
+        """Publish a payload. Never blocks, whatever the subscribers are doing.
+
+        Args:
+            data: Bytes-like payload
+        """
+        length = len(data)
+        if length > self.max_payload:
+            raise ValueError(f"Payload of {length} bytes exceeds slot size {self.slot_size}")
+
+        index = self._tail
+        offset = self._slot_offset(index)
+
+        # Odd slot sequence marks the slot as being written
+        self._store(offset, 2 * index + 1)
+        self._SLOT_LEN.pack_into(self._buf, offset + 8, length)
+        start = offset + self.SLOT_HEADER_SIZE
+        self._buf[start:start + length] = data
+        self._store(offset, 2 * index + 2)
+
+        self._tail = index + 1
+        self._store(self.TAIL_OFFSET, self._tail)
+
+    def close(self):
+        """Stop publishing and close the shared memory block."""
+        if hasattr(self, 'shm') and self._buf is not None:
+            # Subscribers attaching from now on wait for a new publisher
+            mark_retired(self._buf, self.OWNER_OFFSET)
+        super().close()
+
+    def unlink(self):
+        """Unlink (delete) the topic's shared memory block."""
+        if hasattr(self, 'shm'):
+            self.shm.unlink()
+
+
+class Subscriber(_TopicRing):
+    """Reads messages published on a topic from the moment it attaches."""
+
+    def __init__(self, topic: str):
+        """Attach to a topic's shared memory ring.
+
+        Args:
+            topic: Topic name
+        """
+        super().__init__(topic, create=False)
+        self.cursor = self._load(self.TAIL_OFFSET)
+        self.dropped = 0  # messages overwritten before this subscriber read them
+
+    def poll(self) -> Optional[bytes]:
+        """Return the next message without blocking.
+
+        Returns:
+            Copy of the next payload, or None if there is nothing new
+        """
+        while True:
+            tail = self._load(self.TAIL_OFFSET)
+            cursor = self.cursor
+            if cursor >= tail:
+                return None
+
+            # Lapped by the publisher, skip to the oldest message still held
+            if tail - cursor > self.n_slots:
+                self.dropped += tail - cursor - self.n_slots
+                cursor = tail - self.n_slots
+
+            offset = self._slot_offset(cursor)
+            complete = 2 * cursor + 2
+            self.cursor = cursor + 1
+
+            if self._load(offset) != complete:
+                # Overwritten since tail was read
+                self.dropped += 1
+                continue
+
+            length = self._SLOT_LEN.unpack_from(self._buf, offset + 8)[0]
+            start = offset + self.SLOT_HEADER_SIZE
+            data = bytes(self._buf[start:start + min(length, self.max_payload)])
+
+            # Discard the copy if the publisher reused the slot meanwhile
+            if self._load(offset) != complete:
+                self.dropped += 1
+                continue
+
+            return data
+
+    def recv(self, timeout: Optional[float] = None, until=None) -> Optional[bytes]:
+        """Wait for the next message.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None waits forever)
+            until: Optional event whose is_set() ends the wait early
+
+        Returns:
+            Copy of the next payload, or None on timeout
+        """
+        return recv_any((self,), timeout, until)
+
+
+def recv_any(subscribers: Sequence[Subscriber], timeout: Optional[float] = None,
+             until=None) -> Optional[bytes]:
+    """Wait for the next message on any of several subscriptions.
+
+    Subscribers are checked in order, so earlier ones take priority. Spins
+    briefly, then polls with an exponential backoff capped at
+    Config.SHM_BUS_MAX_POLL_INTERVAL; publishing never notifies subscribers,
+    which keeps it a pure memory write.
+
+    Args:
+        subscribers: Subscribers to poll
+        timeout: Maximum time to wait in seconds (None waits forever)
+        until: Optional event whose is_set() ends the wait early. It is
+            checked on every poll, so it should be cheap, such as a
+            ShutdownEvent rather than a multiprocessing.Event.
+
+    Returns:
+        Copy of the next payload, or None on timeout or once until is set
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    spins = 0
+    delay = 0.00001
+
+    while True:
+        for subscriber in subscribers:
+            data = subscriber.poll()
+            if data is not None:
+                return data
+
+        if until is not None and until.is_set():
+            return None
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+
+        if spins < Config.SHM_BUS_SPINS:
+            spins += 1
+        else:
+            time.sleep(delay)
+            delay = min(delay * 2, Config.SHM_BUS_MAX_POLL_INTERVAL)
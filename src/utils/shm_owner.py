@@ -0,0 +1,47 @@
+"""
+Ownership word for named shared memory segments.
+A creator unlinks and recreates its segment on startup, so a process that
+attaches by name can race with it and map a segment left behind by a run
+that crashed. Creators stamp the segment with a magic number and their pid
+once it is initialized and clear the stamp before unlinking it; attachers
+only accept a stamped segment whose creator is still running.
+"""
+import os
+import struct
+
+
+# Magic number (u32) and creator pid (u32)
+OWNER = struct.Struct('<II')
+OWNER_SIZE = OWNER.size
+
+MAGIC = 0x52474E53  # "SNGR"
+
+
+def mark_live(buf, offset: int) -> None:
+    """Stamp an initialized segment as owned by this process."""
+    OWNER.pack_into(buf, offset, MAGIC, os.getpid())
+
+
+def mark_retired(buf, offset: int) -> None:
+    """Clear the stamp, so nothing attaches to a segment about to be unlinked."""
+    if len(buf) >= offset + OWNER_SIZE:
+        OWNER.pack_into(buf, offset, 0, 0)
+
+
+def is_live(buf, offset: int) -> bool:
+    """Return True if the segment is stamped by a process that is still running."""
+    if len(buf) < offset + OWNER_SIZE:
+        return False
+
+    magic, pid = OWNER.unpack_from(buf, offset)
+    if magic != MAGIC:
+        return False
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, just owned by another user
+        pass
+    return True
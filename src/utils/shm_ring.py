@@ -0,0 +1,230 @@
+"""
+Shared memory ring buffer for single-producer/single-consumer IPC.
+Replaces a TCP hop between co-located processes with a copy into shared
+memory plus a one-byte doorbell over a Unix datagram socket for wakeups.
+"""
+import select
+import socket
+import struct
+from multiprocessing import shared_memory
+from typing import Iterator, Optional
+
+from .shm_owner import is_live, mark_live, mark_retired
+
+
+class ShmRing:
+    """Single-producer/single-consumer ring of fixed-size slots in shared memory."""
+
+    # Memory layout, in 64-byte cache lines:
+    # - Line 0: head, next slot the consumer reads (u64)
+    # - Line 1: tail, next slot the producer writes (u64)
+    # - Line 2: slot size in bytes (u32), number of slots (u32), then the
+    #   owner stamp, magic and creator pid (see shm_owner)
+    # - Remaining: slots, each a 4-byte payload length followed by the payload
+    #
+    # Head and tail sit on separate cache lines so the consumer's head stores
+    # do not invalidate the producer's tail line and vice versa (false
+    # sharing), and the slots start cache-line aligned.
+    #
+    # Only the consumer writes head and only the producer writes tail, so no
+    # lock is needed. The producer fills a slot before publishing the new tail;
+    # on x86 stores are not reordered with other stores, so a consumer that
+    # observes the tail also observes the slot contents.
+
+    CACHE_LINE = 64
+    HEADER_SIZE = 3 * CACHE_LINE
+    SLOT_HEADER_SIZE = 4
+
+    _INDEX = struct.Struct('<Q')
+    _GEOMETRY = struct.Struct('<II')
+    _SLOT_LEN = struct.Struct('<I')
+
+    HEAD_OFFSET = 0
+    TAIL_OFFSET = CACHE_LINE
+    GEOMETRY_OFFSET = 2 * CACHE_LINE
+    OWNER_OFFSET = GEOMETRY_OFFSET + 8
+
+    def __init__(self, name: str, create: bool = True,
+                 slot_size: int = 1024, n_slots: int = 1024):
+        """Initialize the ring.
+
+        Args:
+            name: Name of the shared memory block
+            create: Whether to create new shared memory or attach to existing
+            slot_size: Size of each slot in bytes (creator only)
+            n_slots: Number of slots in the ring (creator only)
+        """
+        self.name = name
+        self._doorbell = None
+        self._owner = create
+
+        if create:
+            try:
+                old_shm = shared_memory.SharedMemory(name=name)
+                mark_retired(old_shm.buf, self.OWNER_OFFSET)
+                old_shm.close()
+                old_shm.unlink()
+            except FileNotFoundError:
+                pass
+
+            self.shm = shared_memory.SharedMemory(
+                name=name,
+                create=True,
+                size=self.HEADER_SIZE + slot_size * n_slots
+            )
+            self._GEOMETRY.pack_into(self.shm.buf, self.GEOMETRY_OFFSET, slot_size, n_slots)
+            mark_live(self.shm.buf, self.OWNER_OFFSET)
+        else:
+            try:
+                self.shm = shared_memory.SharedMemory(name=name)
+            except FileNotFoundError:
+                raise RuntimeError(f"Shared memory ring '{name}' not found")
+
+            # Left behind by a creator that died, or not initialized yet
+            if not is_live(self.shm.buf, self.OWNER_OFFSET):
+                self.shm.close()
+                del self.shm
+                raise RuntimeError(f"Shared memory ring '{name}' has no live owner")
+
+        self.slot_size, self.n_slots = self._GEOMETRY.unpack_from(self.shm.buf, self.GEOMETRY_OFFSET)
+        self.max_payload = self.slot_size - self.SLOT_HEADER_SIZE
+        self._buf = self.shm.buf
+
+        # Abstract-namespace address of the consumer's doorbell socket
+        self._doorbell_addr = '\0' + name + '.doorbell'
+        self._bell = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._bell.setblocking(False)
+
+    def _load(self, offset: int) -> int:
+        return self._INDEX.unpack_from(self._buf, offset)[0]
+
+    def _store(self, offset: int, value: int) -> None:
+        self._INDEX.pack_into(self._buf, offset, value)
+
+    def __len__(self) -> int:
+        """Number of slots published but not yet consumed."""
+        return self._load(self.TAIL_OFFSET) - self._load(self.HEAD_OFFSET)
+
+    def push(self, data, ring_doorbell: bool = True) -> bool:
+        """Copy a payload into the next free slot and wake the consumer.
+
+        Args:
+            data: Bytes-like payload
+            ring_doorbell: Whether to wake the consumer. A producer pushing
+                a batch passes False and calls ring_doorbell() once after
+                the last payload, saving a syscall per message.
+
+        Returns:
+            True if the payload was published, False if the ring is full
+        """
+        length = len(data)
+        if length > self.max_payload:
+            raise ValueError(f"Payload of {length} bytes exceeds slot size {self.slot_size}")
+
+        tail = self._load(self.TAIL_OFFSET)
+        if tail - self._load(self.HEAD_OFFSET) >= self.n_slots:
+            return False
+
+        offset = self.HEADER_SIZE + (tail % self.n_slots) * self.slot_size
+        self._SLOT_LEN.pack_into(self._buf, offset, length)
+        start = offset + self.SLOT_HEADER_SIZE
+        self._buf[start:start + length] = data
+
+        # Publish the slot, then ring the doorbell
+        self._store(self.TAIL_OFFSET, tail + 1)
+        if ring_doorbell:
+            self.ring_doorbell()
+        return True
+
+    def ring_doorbell(self) -> None:
+        """Wake the consumer if it is waiting on the doorbell."""
+        try:
+            self._bell.sendto(b'\x01', self._doorbell_addr)
+        except (BlockingIOError, ConnectionRefusedError, FileNotFoundError):
+            # Doorbell already pending, or no consumer attached yet
+            pass
+
+    def drain(self) -> Iterator[memoryview]:
+        """Yield zero-copy views of every published slot.
+
+        Each slot is released back to the producer when the caller advances
+        the iterator, so a yielded view must not be used after that.
+
+        Yields:
+            Memoryview of each payload in publication order
+        """
+        head = self._load(self.HEAD_OFFSET)
+        tail = self._load(self.TAIL_OFFSET)
+
+        while head < tail:
+            offset = self.HEADER_SIZE + (head % self.n_slots) * self.slot_size
+            length = self._SLOT_LEN.unpack_from(self._buf, offset)[0]
+            start = offset + self.SLOT_HEADER_SIZE
+            view = self._buf[start:start + length]
+            try:
+                yield view
+            finally:
+                view.release()
+            head += 1
+            self._store(self.HEAD_OFFSET, head)
+
+    def bind_doorbell(self) -> None:
+        """Bind the consumer side of the doorbell. Call once, from the consumer."""
+        if self._doorbell is None:
+            self._doorbell = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._doorbell.bind(self._doorbell_addr)
+            self._doorbell.setblocking(False)
+
+    def fileno(self) -> int:
+        """File descriptor of the doorbell, readable when the producer publishes."""
+        self.bind_doorbell()
+        return self._doorbell.fileno()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the ring has data or the timeout expires.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            True if there is data to drain
+        """
+        if len(self):
+            return True
+
+        readable, _, _ = select.select([self.fileno()], [], [], timeout)
+        if readable:
+            self.clear_doorbell()
+
+        return len(self) > 0
+
+    def clear_doorbell(self) -> None:
+        """Consume pending doorbell wakeups.
+
+        A consumer that waits on fileno() with its own selector calls this
+        before draining, so a push that lands after the drain rings again.
+        """
+        if self._doorbell is None:
+            return
+        try:
+            while self._doorbell.recv(64):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        """Close the ring and its doorbell sockets."""
+        self._bell.close()
+        if self._doorbell is not None:
+            self._doorbell.close()
+        if hasattr(self, 'shm'):
+            if self._owner and self._buf is not None:
+                # Nothing new attaches to a ring whose creator is done with it
+                mark_retired(self._buf, self.OWNER_OFFSET)
+            self._buf = None
+            self.shm.close()
+
+    def unlink(self):
+        """Unlink (delete) the shared memory block."""
+        if hasattr(self, 'shm'):
+            self.shm.unlink()
@@ -0,0 +1,63 @@
+"""
+Process-local shutdown signalling that event loops can wait on.
+"""
+import os
+import signal
+import sys
+
+
+class ShutdownEvent:
+    """Shutdown flag backed by a file descriptor.
+
+    Replaces multiprocessing.Event within a single process: is_set() is a
+    plain attribute read rather than a semaphore syscall, and fileno() can be
+    registered with a selector next to sockets, so one select() call wakes
+    for either I/O or shutdown. set() only makes a write() syscall, so it is
+    safe to call from a signal handler.
+    """
+
+    _ONE = (1).to_bytes(8, sys.byteorder)
+
+    def __init__(self):
+        self._flag = False
+        if hasattr(os, 'eventfd'):
+            self._read_fd = self._write_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        else:
+            self._read_fd, self._write_fd = os.pipe()
+            os.set_blocking(self._read_fd, False)
+            os.set_blocking(self._write_fd, False)
+
+    def set(self):
+        """Set the flag and make the descriptor readable."""
+        if self._flag:
+            return
+        self._flag = True
+        try:
+            os.write(self._write_fd, self._ONE)
+        except OSError:
+            # Already readable
+            pass
+
+    def is_set(self) -> bool:
+        """Return True once set() has been called."""
+        return self._flag
+
+    def fileno(self) -> int:
+        """Descriptor that becomes readable once the event is set."""
+        return self._read_fd
+
+    def close(self):
+        """Close the underlying descriptors."""
+        if self._write_fd != self._read_fd:
+            os.close(self._write_fd)
+        os.close(self._read_fd)
+
+
+def ignore_interrupts():
+    """Ignore SIGINT in a child process.
+
+    Ctrl+C reaches every process in the terminal's foreground group, so each
+    child would otherwise die with its own KeyboardInterrupt traceback. The
+    parent catches it instead and stops the children with SIGTERM.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
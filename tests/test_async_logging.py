@@ -0,0 +1,55 @@
+"""
+Tests for asynchronous logging.
+"""
+import logging
+import unittest
+from src.utils.async_logging import AsyncLogHandler
+
+
+class ListHandler(logging.Handler):
+    """Handler that collects formatted messages."""
+    
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+    
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+class TestAsyncLogHandler(unittest.TestCase):
+    """Test asynchronous log handler functionality."""
+    
+    def setUp(self):
+        """Set up test."""
+        self.target = ListHandler()
+        self.handler = AsyncLogHandler([self.target], flush_interval=0.001)
+        self.logger = logging.getLogger("test_async_logging")
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+    
+    def tearDown(self):
+        """Clean up test."""
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+    
+    def test_records_written_in_order(self):
+        """Test queued records reach the target handler in order."""
+        for i in range(100):
+            self.logger.warning("message %d", i)
+        self.handler.close()
+        
+        self.assertEqual(self.target.messages, [f"message {i}" for i in range(100)])
+    
+    def test_target_level_respected(self):
+        """Test the target handler's level still filters records."""
+        self.target.setLevel(logging.ERROR)
+        self.logger.warning("dropped")
+        self.logger.error("kept")
+        self.handler.close()
+        
+        self.assertEqual(self.target.messages, ["kept"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Tests for Gateway client handling.
+"""
+import selectors
+import socket
+import unittest
+from src.processes.gateway import Gateway
+from src.utils.protocol import Message, MessageType
+
+
+class _TimedOutSocket(socket.socket):
+    """Socket whose sends fail the way a dead TCP peer's do."""
+
+    def sendmsg(self, *args):
+        raise TimeoutError(110, "Connection timed out")
+
+
+class TestGateway(unittest.TestCase):
+    """Test Gateway functionality."""
+
+    def setUp(self):
+        """Set up test."""
+        self.gateway = Gateway()
+        self.gateway.selector = selectors.DefaultSelector()
+        self.sockets = []
+
+    def tearDown(self):
+        """Clean up test."""
+        self.gateway.selector.close()
+        self.gateway.shutdown_event.close()
+        for sock in self.sockets:
+            sock.close()
+
+    def add_client(self, client_socket, address):
+        """Register a client socket the way accept_client does."""
+        client_socket.setblocking(False)
+        self.gateway.clients[client_socket] = bytearray()
+        self.gateway.selector.register(client_socket, selectors.EVENT_READ, address)
+
+    def test_socket_error_drops_only_that_client(self):
+        """Test a send error on one client disconnects it and the others keep receiving."""
+        failing, failing_peer = socket.socketpair()
+        failing = _TimedOutSocket(failing.family, failing.type, failing.proto, failing.detach())
+        healthy, healthy_peer = socket.socketpair()
+        self.sockets += [failing, failing_peer, healthy, healthy_peer]
+        self.add_client(failing, 'failing')
+        self.add_client(healthy, 'healthy')
+
+        frame = Message(MessageType.NEWS_SENTIMENT, {'symbol': 'AAPL'}).frame()
+        with self.assertLogs("Gateway", level="WARNING"):
+            self.gateway.broadcast([('news', frame)])
+
+        self.assertEqual(list(self.gateway.clients), [healthy])
+        healthy_peer.settimeout(5.0)
+        self.assertEqual(Message.read_message(healthy_peer)[0].data, {'symbol': 'AAPL'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@ import socket
 
 from src.processes.gateway import run_gateway
 from src.processes.ordermanager import run_ordermanager
-from src.utils.protocol import Message, MessageType
+from src.utils.protocol import Message, MessageType, configure_low_latency
 from src.utils.config import Config
 
 
@@ -26,6 +26,7 @@ class TestIntegration(unittest.TestCase):
             # Connect to Gateway
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.connect((Config.GATEWAY_HOST, Config.GATEWAY_PORT))
+            configure_low_latency(sock)
             sock.settimeout(5.0)
             
             # Receive a message
@@ -53,6 +54,7 @@ class TestIntegration(unittest.TestCase):
             # Connect to OrderManager
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.connect((Config.ORDERMANAGER_HOST, Config.ORDERMANAGER_PORT))
+            configure_low_latency(sock)
             
             # Send an order
             order = {
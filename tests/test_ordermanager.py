@@ -0,0 +1,80 @@
+"""
+Tests for OrderManager trade handling.
+"""
+import json
+import os
+import tempfile
+import unittest
+from src.processes.ordermanager import OrderManager
+from src.utils.protocol import Message, MessageType
+from src.utils.shm_ring import ShmRing
+
+
+class TestOrderManager(unittest.TestCase):
+    """Test OrderManager functionality."""
+    
+    def setUp(self):
+        """Set up test."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmpdir.name, "trades.log")
+        self.ordermanager = OrderManager(log_file=self.log_file)
+    
+    def tearDown(self):
+        """Clean up test."""
+        self.ordermanager.stop_trade_log()
+        self.tmpdir.cleanup()
+    
+    def test_trade_log_batches(self):
+        """Test every queued trade is written, in order, by shutdown."""
+        self.ordermanager.start_trade_log()
+        for i in range(1000):
+            self.ordermanager.process_order({
+                'order_id': f'ORD{i}', 'symbol': 'AAPL', 'side': 'BUY',
+                'price': 100.0, 'quantity': 10
+            })
+        self.ordermanager.stop_trade_log()
+        
+        with open(self.log_file) as f:
+            trades = [json.loads(line) for line in f]
+        
+        self.assertEqual([trade['order_id'] for trade in trades], [f'ORD{i}' for i in range(1000)])
+    
+    def test_trade_log_without_writer(self):
+        """Test trades are written straight away when no writer thread runs."""
+        order = {
+            'order_id': 'ORD1', 'symbol': 'AAPL', 'side': 'BUY',
+            'price': 100.0, 'quantity': 10
+        }
+        self.ordermanager.log_trade(self.ordermanager.execute_order(order))
+        self.ordermanager.process_order(dict(order, order_id='ORD2'))
+        
+        with open(self.log_file) as f:
+            trades = [json.loads(line) for line in f]
+        
+        self.assertEqual([trade['order_id'] for trade in trades], ['ORD1', 'ORD2'])
+        self.assertTrue(self.ordermanager._log_queue.empty())
+    
+    def test_drain_order_ring(self):
+        """Test orders pushed to the order ring are executed."""
+        self.ordermanager.order_ring = ShmRing(name="test_om_ring", create=True, slot_size=512, n_slots=8)
+        producer = ShmRing(name="test_om_ring", create=False)
+        try:
+            for i in range(5):
+                producer.push(Message(MessageType.ORDER, {
+                    'order_id': f'ORD{i}', 'symbol': 'AAPL', 'side': 'SELL',
+                    'price': 100.0, 'quantity': 10
+                }).body())
+            
+            self.ordermanager.drain_order_ring()
+            
+            self.assertEqual(self.ordermanager.total_executed, 5)
+            self.assertEqual([order['order_id'] for order in self.ordermanager.orders], [f'ORD{i}' for i in range(5)])
+            self.assertEqual(len(producer), 0)
+        finally:
+            producer.close()
+            self.ordermanager.order_ring.close()
+            self.ordermanager.order_ring.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
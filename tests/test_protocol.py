@@ -1,8 +1,14 @@
 """
 Tests for message protocol.
 """
+import socket
+import threading
 import unittest
-from src.utils.protocol import Message, MessageType
+from src.utils.protocol import (
+    Message, MessageType, FramedReader, configure_low_latency, new_market_data_frame, pack_market_data,
+    send_frames, json_dumps, json_loads, unpack_market_data_quote, encode_body, decode_body, msgpack
+)
+from src.utils.config import Config
 
 
 class TestProtocol(unittest.TestCase):
@@ -26,6 +32,17 @@ class TestProtocol(unittest.TestCase):
         self.assertIsInstance(serialized, bytes)
         self.assertGreater(len(serialized), 4)  # At least length prefix
     
+    def test_serialize_into(self):
+        """Test messages serialized back to back into a small buffer match serialize()."""
+        messages = [Message(MessageType.ORDER, {'order_id': f'ORD{i}', 'quantity': i}) for i in range(3)]
+        buf = bytearray(8)
+        
+        end = 0
+        for msg in messages:
+            end = msg.serialize_into(buf, end)
+        
+        self.assertEqual(bytes(buf[:end]), b''.join(msg.serialize() for msg in messages))
+    
     def test_message_deserialization(self):
         """Test message deserialization."""
         data = {'symbol': 'AAPL', 'price': 150.0}
@@ -57,6 +74,248 @@ class TestProtocol(unittest.TestCase):
             
             self.assertEqual(deserialized.data, data)
 
+    def test_message_frame(self):
+        """Test frame splits the serialized message into prefix and body."""
+        msg = Message(MessageType.ORDER, {'order_id': 'ORD123', 'quantity': 100})
+        
+        length_prefix, body = msg.frame()
+        
+        self.assertEqual(length_prefix + body, msg.serialize())
+        self.assertEqual(int.from_bytes(length_prefix, 'big'), len(body))
+        self.assertEqual(Message.deserialize(body).data, msg.data)
+    
+    def test_json_helpers(self):
+        """Test JSON helpers round-trip through every buffer type."""
+        data = {'order_id': 'ORD1', 'price': 101.25, 'levels': [[1.0, 2.0]]}
+        encoded = json_dumps(data)
+        
+        self.assertIsInstance(encoded, bytes)
+        for buf in (encoded, bytearray(encoded), memoryview(encoded)):
+            self.assertEqual(json_loads(buf), data)
+    
+    def test_json_body_accepted(self):
+        """Test JSON message bodies decode whichever codec encodes new messages."""
+        body = json_dumps({'type': MessageType.ORDER.value, 'data': {'order_id': 'ORD1'}})
+        msg = Message.deserialize(body)
+        
+        self.assertEqual(msg.msg_type, MessageType.ORDER)
+        self.assertEqual(msg.data, {'order_id': 'ORD1'})
+    
+    def test_unknown_message_type(self):
+        """Test a body with an unknown type value is rejected."""
+        with self.assertRaises(ValueError):
+            Message.deserialize(json_dumps({'type': 99, 'data': {}}))
+    
+    def test_market_data_frame(self):
+        """Test fixed-layout market data frames decode to market data messages."""
+        frame = new_market_data_frame()
+        pack_market_data(
+            frame, b'GOOGL', 1700000000.5,
+            [100.0, 99.9, 99.8, 99.7, 99.6], [10.0, 20.0, 30.0, 40.0, 50.0],
+            [100.1, 100.2, 100.3, 100.4, 100.5], [15.0, 25.0, 35.0, 45.0, 55.0],
+            100.05, 12345
+        )
+        
+        msg = Message.deserialize(memoryview(frame)[4:])
+        
+        self.assertEqual(msg.msg_type, MessageType.MARKET_DATA)
+        self.assertEqual(msg.data['symbol'], 'GOOGL')
+        self.assertEqual(msg.data['timestamp'], 1700000000.5)
+        self.assertEqual(msg.data['bids'][0], (100.0, 10.0))
+        self.assertEqual(msg.data['asks'][4], (100.5, 55.0))
+        self.assertEqual(msg.data['last_price'], 100.05)
+        self.assertEqual(msg.data['volume'], 12345)
+        
+        # Decoded symbols are interned and shared across frames
+        self.assertIs(Message.deserialize(memoryview(frame)[4:]).data['symbol'], msg.data['symbol'])
+        self.assertIs(msg.data['symbol'], Config.SYMBOLS[1])
+        
+        # The quote decoder reads the same fixed fields and skips the levels
+        quote = unpack_market_data_quote(memoryview(frame)[4:])
+        self.assertEqual(quote, {key: msg.data[key] for key in ('symbol', 'timestamp', 'last_price', 'volume')})
+    
+    def test_send_frames_batch(self):
+        """Test a batch of frames is delivered and parsed in order."""
+        left, right = socket.socketpair()
+        try:
+            msgs = [Message(MessageType.MARKET_DATA, {'seq': i}) for i in range(10)]
+            send_frames(left, [msg.serialize() for msg in msgs])
+            
+            reader = FramedReader(right)
+            received = []
+            while len(received) < len(msgs):
+                received.extend(reader.read_messages())
+            
+            self.assertEqual([msg.data['seq'] for msg, size in received], list(range(10)))
+            self.assertEqual(received[0][1], len(msgs[0].serialize()))
+        finally:
+            left.close()
+            right.close()
+    
+    def test_send_many(self):
+        """Test send_many delivers a batch that one FramedReader read parses."""
+        left, right = socket.socketpair()
+        try:
+            msgs = [Message(MessageType.ORDER, {'order_id': f'ORD{i}'}) for i in range(20)]
+            Message.send_many(left, msgs)
+            
+            received = FramedReader(right).read_messages()
+            
+            self.assertEqual([msg.data for msg, size in received], [msg.data for msg in msgs])
+        finally:
+            left.close()
+            right.close()
+    
+    def test_configure_low_latency(self):
+        """Test configure_low_latency disables Nagle on a connected TCP socket."""
+        with socket.create_server(('127.0.0.1', 0)) as server:
+            with socket.create_connection(server.getsockname()) as client:
+                configure_low_latency(client)
+                
+                self.assertTrue(client.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+    
+    def test_read_message_across_reads(self):
+        """Test read_message reassembles a message that arrives in pieces."""
+        left, right = socket.socketpair()
+        try:
+            msg = Message(MessageType.ORDERBOOK_UPDATE, {'levels': [[100.0, 1.0]] * 50000})
+            serialized = msg.serialize()
+            sender = threading.Thread(target=left.sendall, args=(serialized,))
+            sender.start()
+            
+            received, size = Message.read_message(right)
+            sender.join()
+            
+            self.assertEqual(received.data, msg.data)
+            self.assertEqual(size, len(serialized))
+        finally:
+            left.close()
+            right.close()
+    
+    def test_read_message_into(self):
+        """Test reading consecutive messages into one reused message and buffer."""
+        left, right = socket.socketpair()
+        try:
+            msgs = [Message(MessageType.ORDER, {'order_id': 'ORD1', 'note': 'x' * 100}),
+                    Message(MessageType.HEARTBEAT, {'seq': 2})]
+            left.sendall(b''.join(msg.serialize() for msg in msgs))
+            
+            reused = Message(MessageType.HEARTBEAT, {})
+            buf = bytearray()
+            for msg in msgs:
+                size = Message.read_message_into(right, reused, buf)
+                
+                self.assertEqual((reused.msg_type, reused.data), (msg.msg_type, msg.data))
+                self.assertEqual(size, len(msg.serialize()))
+        finally:
+            left.close()
+            right.close()
+    
+    def test_framed_reader_partial(self):
+        """Test a message split across reads is reassembled."""
+        left, right = socket.socketpair()
+        try:
+            serialized = Message(MessageType.ORDER, {'order_id': 'ORD123'}).serialize()
+            reader = FramedReader(right)
+            
+            left.sendall(serialized[:6])
+            self.assertEqual(reader.read_messages(), [])
+            
+            left.sendall(serialized[6:])
+            (msg, size), = reader.read_messages()
+            self.assertEqual(msg.data, {'order_id': 'ORD123'})
+        finally:
+            left.close()
+            right.close()
+    
+    def test_framed_reader_skips_bad_frame(self):
+        """Test a frame that fails to decode is skipped and the frames around it delivered."""
+        left, right = socket.socketpair()
+        try:
+            bad = b'{not json'
+            left.sendall(
+                Message(MessageType.ORDER, {'order_id': 'ORD1'}).serialize()
+                + len(bad).to_bytes(4, 'big') + bad
+                + Message(MessageType.ORDER, {'order_id': 'ORD2'}).serialize()
+            )
+            
+            reader = FramedReader(right)
+            with self.assertLogs("Protocol", level="WARNING"):
+                messages = reader.read_messages()
+            
+            self.assertEqual([msg.data for msg, size in messages], [{'order_id': 'ORD1'}, {'order_id': 'ORD2'}])
+            self.assertEqual(reader.skipped, 1)
+            
+            left.sendall(Message(MessageType.ORDER, {'order_id': 'ORD3'}).serialize())
+            (msg, size), = reader.read_messages()
+            self.assertEqual(msg.data, {'order_id': 'ORD3'})
+        finally:
+            left.close()
+            right.close()
+    
+    def test_framed_reader_small_buffer(self):
+        """Test messages larger than the buffer and partial tails across refills."""
+        left, right = socket.socketpair()
+        try:
+            msgs = [Message(MessageType.ORDER, {'order_id': f'ORD{i}', 'note': 'x' * (i * 10)})
+                    for i in range(20)]
+            left.sendall(b''.join(msg.serialize() for msg in msgs))
+            
+            reader = FramedReader(right, recv_size=64)
+            received = []
+            while len(received) < len(msgs):
+                received.extend(msg for msg, size in reader.read_messages())
+            
+            self.assertEqual([msg.data for msg in received], [msg.data for msg in msgs])
+        finally:
+            left.close()
+            right.close()
+
+
+@unittest.skipUnless(msgpack, "msgpack not installed")
+class TestMsgpackBody(unittest.TestCase):
+    """Test MessagePack message bodies."""
+    
+    def test_serialize_roundtrip(self):
+        """Test a message body is MessagePack and round-trips through serialize/deserialize."""
+        msg = Message(MessageType.ORDER, {'order_id': 'ORD1', 'price': 101.25, 'note': 'x' * 300})
+        serialized = msg.serialize()
+        body = serialized[4:]
+        
+        self.assertNotEqual(body[:1], b'{')
+        self.assertEqual(msgpack.unpackb(body, raw=False)['data'], msg.data)
+        for buf in (body, bytearray(body), memoryview(body)):
+            result = Message.deserialize(buf)
+            self.assertEqual(result.msg_type, MessageType.ORDER)
+            self.assertEqual(result.data, msg.data)
+    
+    def test_decode_body_dispatch(self):
+        """Test decode_body accepts both JSON and MessagePack bodies."""
+        data = {'type': MessageType.NEWS_SENTIMENT.value, 'data': {'symbol': 'AAPL', 'score': -0.5}}
+        
+        self.assertEqual(decode_body(json_dumps(data)), data)
+        self.assertEqual(decode_body(msgpack.packb(data, use_bin_type=True)), data)
+        self.assertEqual(Message.deserialize(json_dumps(data)).data, data['data'])
+        self.assertEqual(Message.deserialize(msgpack.packb(data, use_bin_type=True)).data, data['data'])
+    
+    def test_encode_body_from_threads(self):
+        """Test bodies packed concurrently from two threads are each packed correctly."""
+        results = {}
+        
+        def pack_many(name):
+            bodies = [{'order_id': f'{name}{i}', 'quantity': i} for i in range(2000)]
+            results[name] = (bodies, [encode_body(body) for body in bodies])
+        
+        threads = [threading.Thread(target=pack_many, args=(name,)) for name in ('A', 'B')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for bodies, encoded in results.values():
+            self.assertEqual(encoded, [msgpack.packb(body, use_bin_type=True) for body in bodies])
+            self.assertEqual([decode_body(buf) for buf in encoded], bodies)
+
 
 if __name__ == '__main__':
     unittest.main()
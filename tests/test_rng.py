@@ -0,0 +1,29 @@
+"""
+Tests for buffered random draws.
+"""
+import itertools
+import random
+import unittest
+from src.utils.rng import uniform_draws, randint_draws
+
+
+class TestRandomDraws(unittest.TestCase):
+    """Test buffered random draws."""
+    
+    def test_uniform_draws(self):
+        """Test uniform draws stay in range across block refills."""
+        values = list(itertools.islice(uniform_draws(random.Random(1), -0.001, 0.001, block_size=16), 100))
+        
+        self.assertEqual(len(values), 100)
+        self.assertTrue(all(-0.001 <= value <= 0.001 for value in values))
+        self.assertGreater(len(set(values)), 90)
+    
+    def test_randint_draws(self):
+        """Test integer draws cover the inclusive range and nothing else."""
+        values = list(itertools.islice(randint_draws(random.Random(1), 10, 12, block_size=16), 1000))
+        
+        self.assertEqual(set(values), {10, 11, 12})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 """
 Tests for shared memory.
 """
+import threading
 import unittest
 import time
+from array import array
 from src.utils.shared_memory import OrderBookSharedMemory
 
 
@@ -33,6 +35,9 @@ class TestSharedMemory(unittest.TestCase):
         
         self.assertIsNotNone(data)
         self.assertIn('timestamp', data)
+        self.assertAlmostEqual(data['timestamp'], time.time(), delta=1.0)
+        self.assertIn('timestamp_ns', data)
+        self.assertLessEqual(data['timestamp_ns'], time.monotonic_ns())
         self.assertIn('bids', data)
         self.assertIn('asks', data)
         
@@ -60,6 +65,52 @@ class TestSharedMemory(unittest.TestCase):
         self.assertEqual(best_bid, 100.0)
         self.assertEqual(best_ask, 100.1)
     
+    def test_best_bid_ask_one_sided(self):
+        """Test the cached top of book follows each write, including an empty side."""
+        self.shm.write_orderbook([(100.0, 10.0)], [(100.1, 10.0)])
+        self.shm.write_orderbook([(99.5, 10.0)], [])
+        
+        self.assertIsNone(self.shm.get_best_bid_ask())
+        
+        self.shm.write_orderbook([(99.5, 10.0)], [(99.6, 1.0)])
+        self.assertEqual(self.shm.get_best_bid_ask(), (99.5, 99.6))
+    
+    def test_write_orderbook_raw(self):
+        """Test writing levels already split into tick and lot arrays."""
+        self.shm.write_orderbook_raw(
+            array('i', [10000, 9990]), array('i', [1000, 2000]), array('i', [10010]), array('i', [500])
+        )
+        
+        data = self.shm.read_orderbook()
+        
+        self.assertEqual(data['bids'], [(100.0, 10.0), (99.9, 20.0)])
+        self.assertEqual(data['asks'], [(100.1, 5.0)])
+    
+    def test_prices_quantized_to_ticks(self):
+        """Test levels are stored as whole ticks and lots and read back as floats."""
+        self.shm.write_orderbook([(118.79, 652.27), (100.004, 0.006)], [(118.8, 1.0)])
+        
+        data = self.shm.read_orderbook()
+        
+        self.assertEqual(data['bids'], [(118.79, 652.27), (100.0, 0.01)])
+        self.assertEqual(self.shm.get_best_bid_ask(), (118.79, 118.8))
+    
+    def test_values_outside_int32(self):
+        """Test prices and sizes that do not fit in int32 ticks or lots are rejected."""
+        self.shm.write_orderbook([(100.0, 10.0)], [(101.0, 5.0)])
+        
+        with self.assertRaises(ValueError):
+            self.shm.write_orderbook([(21474836.48, 10.0)], [])
+        with self.assertRaises(ValueError):
+            self.shm.write_orderbook([], [(101.0, -21474836.49)])
+        with self.assertRaises(ValueError):
+            self.shm.write_orderbook_raw(array('q', [2 ** 40]), array('i', [1]), array('i'), array('i'))
+        
+        # The rejected writes left the previous book intact
+        data = self.shm.read_orderbook()
+        self.assertEqual(data['bids'], [(100.0, 10.0)])
+        self.assertEqual(data['asks'], [(101.0, 5.0)])
+    
     def test_empty_orderbook(self):
         """Test reading empty order book."""
         # Initially, order book should be empty
@@ -85,6 +136,48 @@ class TestSharedMemory(unittest.TestCase):
         self.assertEqual(data['bids'][0][0], 101.0)
         self.assertEqual(data['asks'][0][0], 101.1)
 
+    def test_too_many_levels(self):
+        """Test writing more levels than the layout holds is rejected."""
+        levels = [(100.0, 1.0)] * (OrderBookSharedMemory.MAX_LEVELS + 1)
+        
+        with self.assertRaises(ValueError):
+            self.shm.write_orderbook(levels, [(100.1, 1.0)])
+    
+    def test_reader_attaches(self):
+        """Test a second handle sees writes through shared memory."""
+        reader = OrderBookSharedMemory(name=self.shm_name, create=False)
+        try:
+            self.shm.write_orderbook([(100.0, 10.0)], [(100.1, 5.0)])
+            data = reader.read_orderbook()
+            self.assertEqual(data['bids'], [(100.0, 10.0)])
+            self.assertEqual(data['asks'], [(100.1, 5.0)])
+        finally:
+            reader.close()
+    
+    def test_concurrent_reads_not_torn(self):
+        """Test a reader racing the writer only ever sees complete books."""
+        reader = OrderBookSharedMemory(name=self.shm_name, create=False)
+        books = [([(float(n), float(n))] * n, [(float(n), float(n))] * n) for n in (1, 50, 500)]
+        self.shm.write_orderbook(*books[0])
+        done = threading.Event()
+        
+        def write_books():
+            for i in range(3000):
+                self.shm.write_orderbook(*books[i % len(books)])
+            done.set()
+        
+        writer = threading.Thread(target=write_books)
+        writer.start()
+        try:
+            while not done.is_set():
+                data = reader.read_orderbook()
+                n = len(data['bids'])
+                self.assertEqual(data['bids'], [(float(n), float(n))] * n)
+                self.assertEqual(data['asks'], data['bids'])
+        finally:
+            writer.join()
+            reader.close()
+
 
 if __name__ == '__main__':
     unittest.main()
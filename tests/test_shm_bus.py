@@ -0,0 +1,132 @@
+"""
+Tests for the shared memory pub/sub bus.
+"""
+import subprocess
+import sys
+import unittest
+from src.utils.shm_bus import Publisher, Subscriber, recv_any
+from src.utils.shm_owner import MAGIC, OWNER, is_live
+from src.utils.protocol import Message, MessageType
+
+
+class TestShmBus(unittest.TestCase):
+    """Test shared memory bus functionality."""
+    
+    def setUp(self):
+        """Set up test."""
+        self.publisher = Publisher("test_topic", slot_size=256, n_slots=4)
+        self.subscriber = Subscriber("test_topic")
+    
+    def tearDown(self):
+        """Clean up test."""
+        self.subscriber.close()
+        self.publisher.close()
+        self.publisher.unlink()
+    
+    def test_missing_topic(self):
+        """Test subscribing to a topic nobody publishes."""
+        with self.assertRaises(RuntimeError):
+            Subscriber("test_missing_topic")
+    
+    def test_stale_topic(self):
+        """Test subscribing to a topic whose publisher died is refused."""
+        dead = subprocess.Popen([sys.executable, '-c', ''])
+        dead.wait()
+        OWNER.pack_into(self.publisher.shm.buf, Publisher.OWNER_OFFSET, MAGIC, dead.pid)
+        
+        with self.assertRaises(RuntimeError):
+            Subscriber("test_topic")
+    
+    def test_replaced_topic(self):
+        """Test a restarted publisher retires the segment it replaces."""
+        replacement = Publisher("test_topic", slot_size=256, n_slots=4)
+        try:
+            self.assertFalse(is_live(self.publisher.shm.buf, Publisher.OWNER_OFFSET))
+            late = Subscriber("test_topic")
+            try:
+                replacement.send(b'fresh')
+                self.assertEqual(late.poll(), b'fresh')
+                self.assertIsNone(self.subscriber.poll())
+            finally:
+                late.close()
+        finally:
+            replacement.close()
+    
+    def test_send_recv(self):
+        """Test payloads arrive in order."""
+        self.publisher.send(b'first')
+        self.publisher.send(b'second')
+        
+        self.assertEqual(self.subscriber.recv(timeout=1.0), b'first')
+        self.assertEqual(self.subscriber.recv(timeout=1.0), b'second')
+        self.assertIsNone(self.subscriber.poll())
+    
+    def test_fan_out(self):
+        """Test every subscriber sees every message."""
+        other = Subscriber("test_topic")
+        try:
+            self.publisher.send(b'tick')
+            self.assertEqual(self.subscriber.poll(), b'tick')
+            self.assertEqual(other.poll(), b'tick')
+        finally:
+            other.close()
+    
+    def test_late_subscriber(self):
+        """Test a subscriber only sees messages published after it attached."""
+        self.publisher.send(b'old')
+        late = Subscriber("test_topic")
+        try:
+            self.publisher.send(b'new')
+            self.assertEqual(late.poll(), b'new')
+        finally:
+            late.close()
+    
+    def test_slow_subscriber_drops(self):
+        """Test a lapped subscriber skips to the oldest retained message."""
+        for i in range(10):
+            self.publisher.send(bytes([i]))
+        
+        received = []
+        while True:
+            payload = self.subscriber.poll()
+            if payload is None:
+                break
+            received.append(payload)
+        
+        self.assertEqual(received, [bytes([i]) for i in range(6, 10)])
+        self.assertEqual(self.subscriber.dropped, 6)
+    
+    def test_recv_timeout(self):
+        """Test recv gives up after the timeout."""
+        self.assertIsNone(self.subscriber.recv(timeout=0.01))
+    
+    def test_recv_any(self):
+        """Test waiting on several topics at once."""
+        publisher = Publisher("test_other_topic", slot_size=256, n_slots=4)
+        subscriber = Subscriber("test_other_topic")
+        try:
+            publisher.send(b'other')
+            self.assertEqual(recv_any([self.subscriber, subscriber], timeout=1.0), b'other')
+        finally:
+            subscriber.close()
+            publisher.close()
+            publisher.unlink()
+    
+    def test_oversized_payload(self):
+        """Test payloads larger than a slot are rejected."""
+        with self.assertRaises(ValueError):
+            self.publisher.send(b'x' * 256)
+    
+    def test_message_roundtrip(self):
+        """Test messages deserialize from bus payloads."""
+        msg = Message(MessageType.NEWS_SENTIMENT, {'symbol': 'AAPL', 'score': 0.5})
+        self.publisher.send(msg.frame()[1])
+        
+        received = Message.deserialize(self.subscriber.recv(timeout=1.0))
+        
+        self.assertEqual(received.msg_type, MessageType.NEWS_SENTIMENT)
+        self.assertEqual(received.data, msg.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Tests for the shared memory ring buffer.
+"""
+import subprocess
+import sys
+import unittest
+from src.utils.shm_ring import ShmRing
+from src.utils.shm_owner import MAGIC, OWNER
+from src.utils.protocol import Message, MessageType
+
+
+class TestShmRing(unittest.TestCase):
+    """Test shared memory ring functionality."""
+
+    def setUp(self):
+        """Set up test."""
+        self.producer = ShmRing(name="test_shm_ring", create=True, slot_size=256, n_slots=4)
+        self.consumer = ShmRing(name="test_shm_ring", create=False)
+        self.consumer.bind_doorbell()
+
+    def tearDown(self):
+        """Clean up test."""
+        self.consumer.close()
+        self.producer.close()
+        self.producer.unlink()
+
+    def test_geometry_shared(self):
+        """Test consumer sees the producer's slot geometry."""
+        self.assertEqual(self.consumer.slot_size, 256)
+        self.assertEqual(self.consumer.n_slots, 4)
+
+    def test_indices_on_separate_cache_lines(self):
+        """Test head, tail and the first slot each start their own cache line."""
+        offsets = [ShmRing.HEAD_OFFSET, ShmRing.TAIL_OFFSET, ShmRing.HEADER_SIZE]
+
+        self.assertEqual([offset // ShmRing.CACHE_LINE for offset in offsets], [0, 1, 3])
+        self.assertEqual(ShmRing.HEADER_SIZE % ShmRing.CACHE_LINE, 0)
+
+    def test_stale_ring(self):
+        """Test attaching to a ring whose creator died is refused."""
+        dead = subprocess.Popen([sys.executable, '-c', ''])
+        dead.wait()
+        OWNER.pack_into(self.producer.shm.buf, ShmRing.OWNER_OFFSET, MAGIC, dead.pid)
+
+        with self.assertRaises(RuntimeError):
+            ShmRing(name="test_shm_ring", create=False)
+
+    def test_retired_ring(self):
+        """Test attaching after the creator closed the ring is refused."""
+        self.producer.close()
+
+        with self.assertRaises(RuntimeError):
+            ShmRing(name="test_shm_ring", create=False)
+
+    def test_push_drain(self):
+        """Test payloads arrive in order."""
+        self.assertTrue(self.producer.push(b'first'))
+        self.assertTrue(self.producer.push(b'second'))
+
+        received = [bytes(view) for view in self.consumer.drain()]
+
+        self.assertEqual(received, [b'first', b'second'])
+        self.assertEqual(len(self.consumer), 0)
+
+    def test_full_ring(self):
+        """Test push reports a full ring and recovers after draining."""
+        for i in range(4):
+            self.assertTrue(self.producer.push(bytes([i])))
+        self.assertFalse(self.producer.push(b'overflow'))
+
+        self.assertEqual(len(list(self.consumer.drain())), 4)
+        self.assertTrue(self.producer.push(b'again'))
+
+    def test_wraparound(self):
+        """Test slots are reused after the ring wraps."""
+        for i in range(10):
+            self.producer.push(f"msg{i}".encode())
+            received = [bytes(view) for view in self.consumer.drain()]
+            self.assertEqual(received, [f"msg{i}".encode()])
+
+    def test_oversized_payload(self):
+        """Test payloads larger than a slot are rejected."""
+        with self.assertRaises(ValueError):
+            self.producer.push(b'x' * 256)
+
+    def test_wait(self):
+        """Test the doorbell wakes the consumer."""
+        self.assertFalse(self.consumer.wait(timeout=0.01))
+        self.producer.push(b'ping')
+        self.assertTrue(self.consumer.wait(timeout=1.0))
+
+    def test_message_roundtrip(self):
+        """Test messages deserialize straight from ring slots."""
+        msg = Message(MessageType.MARKET_DATA, {'symbol': 'AAPL', 'last_price': 150.0})
+        self.producer.push(msg.serialize()[4:])
+
+        for view in self.consumer.drain():
+            received = Message.deserialize(view)
+
+        self.assertEqual(received.msg_type, MessageType.MARKET_DATA)
+        self.assertEqual(received.data, msg.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+"""
+Tests for selectable shutdown events.
+"""
+import selectors
+import unittest
+from src.utils.shutdown import ShutdownEvent
+
+
+class TestShutdownEvent(unittest.TestCase):
+    """Test shutdown event functionality."""
+    
+    def setUp(self):
+        """Set up test."""
+        self.event = ShutdownEvent()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.event, selectors.EVENT_READ)
+    
+    def tearDown(self):
+        """Clean up test."""
+        self.selector.close()
+        self.event.close()
+    
+    def test_initially_clear(self):
+        """Test a new event is not set and not readable."""
+        self.assertFalse(self.event.is_set())
+        self.assertEqual(self.selector.select(timeout=0), [])
+    
+    def test_set_wakes_selector(self):
+        """Test set() makes the event readable."""
+        self.event.set()
+        self.event.set()
+        
+        self.assertTrue(self.event.is_set())
+        events = self.selector.select(timeout=1.0)
+        self.assertEqual([key.fileobj for key, _ in events], [self.event])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests for Strategy signal generation.
+"""
+import socket
+import unittest
+from src.processes.strategy import Strategy
+from src.utils.config import Config
+from src.utils.protocol import Message, MessageType
+from src.utils.shm_ring import ShmRing
+
+
+class TestStrategy(unittest.TestCase):
+    """Test Strategy functionality."""
+    
+    def setUp(self):
+        """Set up test."""
+        self.strategy = Strategy()
+        self.om_socket, self.om_peer = socket.socketpair()
+        self.om_peer.settimeout(5.0)
+    
+    def tearDown(self):
+        """Clean up test."""
+        self.om_socket.close()
+        self.om_peer.close()
+    
+    def test_batch_signals(self):
+        """Test a batch of ticks sends orders only where price and sentiment agree."""
+        for _ in range(3):
+            self.strategy.process_news({'symbol': 'AAPL', 'score': 1.0})
+            self.strategy.process_news({'symbol': 'MSFT', 'score': -1.0})
+        
+        self.strategy.process_market_data_batch([
+            {'symbol': 'AAPL', 'last_price': 100.0},
+            {'symbol': 'MSFT', 'last_price': 100.0},
+            {'symbol': 'GOOGL', 'last_price': 100.0},
+            {'symbol': 'AAPL', 'last_price': 101.0},
+            {'symbol': 'MSFT', 'last_price': 99.0},
+            {'symbol': 'GOOGL', 'last_price': 101.0},
+            {'symbol': 'UNKNOWN', 'last_price': 101.0},
+        ], self.om_socket)
+        
+        orders = [Message.read_message(self.om_peer)[0] for _ in range(2)]
+        
+        self.assertEqual(self.strategy.signal_count, 2)
+        self.assertEqual(self.strategy.order_count, 2)
+        self.assertTrue(all(msg.msg_type == MessageType.ORDER for msg in orders))
+        self.assertEqual(
+            [(msg.data['symbol'], msg.data['side']) for msg in orders],
+            [('AAPL', 'BUY'), ('MSFT', 'SELL')]
+        )
+        self.assertIsNone(self.strategy.generate_signal('UNKNOWN', 101.0))
+    
+    def test_order_handler(self):
+        """Test orders go to the order handler, unserialized, when one is set."""
+        orders = []
+        strategy = Strategy(order_handler=orders.append)
+        for _ in range(3):
+            strategy.process_news({'symbol': 'AAPL', 'score': 1.0})
+        
+        strategy.process_market_data_batch([
+            {'symbol': 'AAPL', 'last_price': 100.0},
+            {'symbol': 'AAPL', 'last_price': 101.0},
+        ], None)
+        
+        self.assertEqual(strategy.order_count, 1)
+        self.assertEqual([(order['symbol'], order['side'], order['price']) for order in orders], [('AAPL', 'BUY', 101.0)])
+    
+    def test_batch_keeps_arrival_order(self):
+        """Test a tick in a batch only sees the news that arrived before it."""
+        orders = []
+        strategy = Strategy(order_handler=orders.append)
+        news = Message(MessageType.NEWS_SENTIMENT, {'symbol': 'AAPL', 'score': 1.0})
+        
+        shutdown = strategy.process_messages([
+            Message(MessageType.MARKET_DATA, {'symbol': 'AAPL', 'last_price': 100.0}),
+            Message(MessageType.MARKET_DATA, {'symbol': 'AAPL', 'last_price': 101.0}),
+            news, news, news,
+            Message(MessageType.MARKET_DATA, {'symbol': 'AAPL', 'last_price': 102.0}),
+            Message(MessageType.SHUTDOWN, {}),
+            Message(MessageType.MARKET_DATA, {'symbol': 'AAPL', 'last_price': 103.0}),
+        ], None)
+        
+        self.assertTrue(shutdown)
+        self.assertEqual([order['price'] for order in orders], [102.0])
+    
+    def test_orders_via_ring(self):
+        """Test orders are pushed to the order ring, not the socket, when one is attached."""
+        consumer = ShmRing(name="test_strategy_ring", create=True, slot_size=512, n_slots=4)
+        self.strategy.order_ring = ShmRing(name="test_strategy_ring", create=False)
+        try:
+            for _ in range(3):
+                self.strategy.process_news({'symbol': 'AAPL', 'score': 1.0})
+            
+            prices = [100.0 * 1.01 ** i for i in range(4)]
+            self.strategy.process_market_data_batch(
+                [{'symbol': 'AAPL', 'last_price': price} for price in prices], None
+            )
+            
+            orders = [Message.deserialize(view) for view in consumer.drain()]
+            
+            self.assertEqual([msg.msg_type for msg in orders], [MessageType.ORDER] * 3)
+            self.assertEqual([msg.data['price'] for msg in orders], prices[1:])
+        finally:
+            self.strategy.order_ring.close()
+            consumer.close()
+            consumer.unlink()
+    
+    def test_full_order_ring_drops(self):
+        """Test an order that finds the ring full for too long is dropped, not waited on forever."""
+        consumer = ShmRing(name="test_strategy_ring", create=True, slot_size=512, n_slots=2)
+        self.strategy.order_ring = ShmRing(name="test_strategy_ring", create=False)
+        try:
+            orders = [
+                {'order_id': f'ORD{i}', 'symbol': 'AAPL', 'side': 'BUY', 'price': 100.0, 'quantity': 10}
+                for i in range(3)
+            ]
+            self.strategy.send_orders(None, orders)
+            
+            pushed = [Message.deserialize(view).data['order_id'] for view in consumer.drain()]
+            
+            self.assertEqual(pushed, ['ORD0', 'ORD1'])
+            self.assertEqual(self.strategy.order_count, 2)
+            self.assertEqual(self.strategy.dropped_orders, 1)
+        finally:
+            self.strategy.order_ring.close()
+            consumer.close()
+            consumer.unlink()
+    
+    def test_news_batch(self):
+        """Test a news batch applies each update to the moving average in order."""
+        self.strategy.process_news_batch([
+            {'symbol': 'AAPL', 'score': 1.0},
+            {'symbol': 'UNKNOWN', 'score': 1.0},
+            {'symbol': 'AAPL', 'score': -1.0},
+        ])
+        
+        self.assertAlmostEqual(self.strategy.sentiment_scores[Config.SYMBOLS.index('AAPL')], 0.3 * -1.0 + 0.7 * 0.3)
+    
+    def test_orders_flushed_per_batch(self):
+        """Test orders beyond ORDER_BATCH_SIZE are all sent, in order."""
+        for _ in range(3):
+            self.strategy.process_news({'symbol': 'AAPL', 'score': 1.0})
+        
+        prices = [100.0 * 1.01 ** i for i in range(Config.ORDER_BATCH_SIZE + 3)]
+        self.strategy.process_market_data_batch(
+            [{'symbol': 'AAPL', 'last_price': price} for price in prices], self.om_socket
+        )
+        
+        orders = [Message.read_message(self.om_peer)[0] for _ in range(len(prices) - 1)]
+        
+        self.assertEqual(self.strategy.order_count, len(prices) - 1)
+        self.assertEqual([msg.data['price'] for msg in orders], prices[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()